@@ -4,17 +4,19 @@ Trading Lab Pro — Main Dashboard
 
 import streamlit as st
 
-from lib.config import APP_NAME, APP_ICON, APP_VERSION
+from lib.config import APP_NAME, APP_ICON, APP_VERSION, DEFAULT_GOALS
 from lib.state import init_session_state
 from lib.styles import MAIN_CSS
 from lib.persistence import save_state, load_state
 from lib.data_fetcher import get_batch_prices, fetch_history, fetch_info, get_current_price
-from lib.trading_engine import get_portfolio_value, get_margin_usage
+from lib.trading_engine import get_portfolio_value, get_margin_usage, portfolio_arrays
 from lib.performance import compute_performance_stats, current_drawdown, compute_var
 from lib.scanner import check_alerts
 
+import numpy as np
 import pandas as pd
-from datetime import datetime
+from bisect import bisect_left
+from datetime import date
 
 # ── Page config ───────────────────────────────────────────────
 st.set_page_config(
@@ -70,12 +72,18 @@ if st.sidebar.button("➕ Add") and new_ticker:
 
 st.title("📊 Dashboard")
 
+# Bind session-state entries once; the lists/dicts are mutated in place below
+ss = st.session_state
+portfolio = ss.portfolio
+watchlist = ss.watchlist
+history = ss.history
+
+
 # ── Top metrics ───────────────────────────────────────────────
 # Fetch watchlist prices for portfolio valuation
-portfolio_tickers = tuple(
-    k.replace("_SHORT", "") for k in st.session_state.portfolio.keys()
-)
-all_tickers = tuple(set(portfolio_tickers + tuple(st.session_state.watchlist)))
+portfolio_tickers = tuple(portfolio_arrays()["tickers"])
+# Sorted so the get_batch_prices cache key is stable across reruns
+all_tickers = tuple(sorted(set(portfolio_tickers + tuple(watchlist))))
 
 if all_tickers:
     live_prices = get_batch_prices(all_tickers)
@@ -83,25 +91,26 @@ else:
     live_prices = {}
 
 total_value = get_portfolio_value(live_prices)
-delta = total_value - st.session_state.initial_balance
-delta_pct = (delta / st.session_state.initial_balance) * 100 if st.session_state.initial_balance > 0 else 0
+delta = total_value - ss.initial_balance
+delta_pct = (delta / ss.initial_balance) * 100 if ss.initial_balance > 0 else 0
 dd = current_drawdown()
 margin = get_margin_usage()
+stats = compute_performance_stats()
 
 c1, c2, c3, c4, c5, c6 = st.columns(6)
 with c1:
-    st.metric("💵 Cash", f"${st.session_state.balance:,.2f}")
+    st.metric("💵 Cash", f"${ss.balance:,.2f}")
 with c2:
     st.metric("📊 Total Value", f"${total_value:,.2f}",
               delta=f"{delta:+,.2f} ({delta_pct:+.2f}%)")
 with c3:
-    st.metric("📈 Positions", len(st.session_state.portfolio))
+    st.metric("📈 Positions", len(portfolio))
 with c4:
     st.metric("📉 Drawdown", f"{dd:.2f}%")
 with c5:
     st.metric("⚠️ Margin Used", f"{margin['margin_pct']:.1f}%")
 with c6:
-    st.metric("📋 Pending Orders", len(st.session_state.pending_orders))
+    st.metric("📋 Pending Orders", len(ss.pending_orders))
 
 # ── Check alerts ──────────────────────────────────────────────
 for ticker, price in live_prices.items():
@@ -111,44 +120,40 @@ for ticker, price in live_prices.items():
             st.toast(a)
 
 # ── Goal tracking ─────────────────────────────────────────────
-goals = st.session_state.get("goals", {})
-today = datetime.now().strftime("%Y-%m-%d")
-today_trades = [t for t in st.session_state.history if t["date"].startswith(today)]
+goals = {**DEFAULT_GOALS, **ss.get("goals", {})}
+today = date.today().isoformat()
+# History is appended chronologically with ISO dates, so today's trades are a suffix
+today_start = bisect_left(history, today, key=lambda t: t["date"][:10])
+today_trades = history[today_start:]
 today_pnls = [t["pnl"] for t in today_trades if t.get("pnl") is not None]
 daily_pnl = sum(today_pnls) if today_pnls else 0
+max_t = goals["daily_max_trades"]
+max_dd = goals["max_drawdown_pct"]
+target = goals["monthly_target_pnl"]
 
 with st.expander("🎯 Trading Goals & Discipline", expanded=False):
     g1, g2, g3, g4 = st.columns(4)
-    with g1:
-        max_t = goals.get("daily_max_trades", 20)
-        st.metric("Trades Today", f"{len(today_trades)} / {max_t}",
-                  delta="OK" if len(today_trades) < max_t else "LIMIT!")
-    with g2:
-        st.metric("Daily P&L", f"${daily_pnl:+,.2f}")
-    with g3:
-        max_dd = goals.get("max_drawdown_pct", 15)
-        color = "normal" if dd < max_dd else "inverse"
-        st.metric("Max DD Target", f"{dd:.1f}% / {max_dd}%")
-    with g4:
-        target = goals.get("monthly_target_pnl", 10000)
-        stats = compute_performance_stats()
-        st.metric("Monthly Target", f"${stats['total_pnl']:+,.0f} / ${target:,.0f}")
+    g1.metric("Trades Today", f"{len(today_trades)} / {max_t}",
+              delta="OK" if len(today_trades) < max_t else "LIMIT!")
+    g2.metric("Daily P&L", f"${daily_pnl:+,.2f}")
+    g3.metric("Max DD Target", f"{dd:.1f}% / {max_dd}%")
+    g4.metric("Monthly Target", f"${stats['total_pnl']:+,.0f} / ${target:,.0f}")
 
 # ── Watchlist ─────────────────────────────────────────────────
 st.markdown("---")
 st.subheader("👁️ Watchlist")
 
-if st.session_state.watchlist:
-    num_cols = min(len(st.session_state.watchlist), 6)
-    rows_needed = (len(st.session_state.watchlist) + num_cols - 1) // num_cols
+if watchlist:
+    num_cols = min(len(watchlist), 6)
+    rows_needed = (len(watchlist) + num_cols - 1) // num_cols
 
     for row_idx in range(rows_needed):
         cols = st.columns(num_cols)
         for col_idx in range(num_cols):
             i = row_idx * num_cols + col_idx
-            if i >= len(st.session_state.watchlist):
+            if i >= len(watchlist):
                 break
-            t = st.session_state.watchlist[i]
+            t = watchlist[i]
             with cols[col_idx]:
                 p = live_prices.get(t)
                 if p:
@@ -156,7 +161,7 @@ if st.session_state.watchlist:
                 else:
                     st.metric(t, "N/A")
                 if st.button("❌", key=f"rm_{t}"):
-                    st.session_state.watchlist.remove(t)
+                    watchlist.remove(t)
                     st.rerun()
 else:
     st.info("Watchlist empty — add tickers in the sidebar.")
@@ -165,26 +170,36 @@ else:
 st.markdown("---")
 st.subheader("💼 Portfolio")
 
-if st.session_state.portfolio:
-    pf_rows = []
-    for key, pos in st.session_state.portfolio.items():
-        clean = key.replace("_SHORT", "")
-        price = live_prices.get(clean) or pos["avg_price"]
-        if pos["side"] == "short":
-            unrealized = (pos["avg_price"] - price) * pos["qty"]
-        else:
-            unrealized = (price - pos["avg_price"]) * pos["qty"]
-        pf_rows.append({
-            "Ticker": key,
-            "Side": pos["side"].upper(),
-            "Qty": pos["qty"],
-            "Avg Price": f"${pos['avg_price']:.2f}",
-            "Current": f"${price:.2f}",
-            "Value": f"${pos['qty'] * price:,.2f}",
-            "Unrealized P&L": f"${unrealized:+,.2f}",
-            "P&L %": f"{(unrealized / (pos['avg_price'] * pos['qty'])) * 100:+.2f}%",
-        })
-    st.dataframe(pd.DataFrame(pf_rows), use_container_width=True, hide_index=True)
+if portfolio:
+    soa = portfolio_arrays()
+    qty, avg = soa["qty"], soa["avg_price"]
+    current = np.array(
+        [live_prices.get(key.replace("_SHORT", "")) or np.nan for key in soa["keys"]],
+        dtype=float,
+    )
+    current = np.where(np.isnan(current), avg, current)
+    unrealized = np.where(soa["short"], avg - current, current - avg) * qty
+
+    df_pf = pd.DataFrame({
+        "Ticker": soa["keys"],
+        "Side": np.where(soa["short"], "SHORT", "LONG"),
+        "Qty": qty.astype(int),
+        "Avg Price": avg,
+        "Current": current,
+        "Value": qty * current,
+        "Unrealized P&L": unrealized,
+        "P&L %": unrealized / (avg * qty) * 100,
+    })
+    st.dataframe(
+        df_pf.style.format({
+            "Avg Price": "${:.2f}",
+            "Current": "${:.2f}",
+            "Value": "${:,.2f}",
+            "Unrealized P&L": "${:+,.2f}",
+            "P&L %": "{:+.2f}%",
+        }),
+        use_container_width=True, hide_index=True,
+    )
 else:
     st.info("No open positions. Head to the **Trading** page to get started!")
 
@@ -192,7 +207,6 @@ else:
 st.markdown("---")
 st.subheader("📈 Quick Stats")
 
-stats = compute_performance_stats()
 if stats["total_trades"] > 0:
     s1, s2, s3, s4, s5, s6 = st.columns(6)
     s1.metric("Total Trades", stats["total_trades"])
@@ -205,11 +219,13 @@ else:
     st.info("No trades yet — statistics will appear after your first closed trade.")
 
 # ── Recent trades ─────────────────────────────────────────────
-if st.session_state.history:
+if history:
     st.markdown("---")
     st.subheader("🕐 Recent Trades")
-    recent = st.session_state.history[-10:][::-1]
-    df_recent = pd.DataFrame(recent)
+    recent = history[-10:][::-1]
     display_cols = ["date", "ticker", "action", "qty", "fill_price", "pnl", "commission"]
-    available = [c for c in display_cols if c in df_recent.columns]
-    st.dataframe(df_recent[available], use_container_width=True, hide_index=True)
+    present = set().union(*recent)
+    available = [c for c in display_cols if c in present]
+    # Only the displayed columns are materialized (notes, tags, ... are skipped)
+    df_recent = pd.DataFrame.from_records(recent, columns=available)
+    st.dataframe(df_recent, use_container_width=True, hide_index=True)
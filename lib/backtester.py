@@ -4,8 +4,9 @@ Backtesting engine — test strategies on historical data.
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Callable
+from typing import Callable, Iterable
 
 import numpy as np
 import pandas as pd
@@ -17,7 +18,7 @@ from lib import indicators as ind
 class BacktestResult:
     """Container for backtest output."""
     trades: list[dict] = field(default_factory=list)
-    equity_curve: list[float] = field(default_factory=list)
+    equity_curve: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.float64))
     dates: list = field(default_factory=list)
     total_return_pct: float = 0
     buy_hold_return_pct: float = 0
@@ -34,57 +35,59 @@ class BacktestResult:
 
 # ── Built-in strategies ───────────────────────────────────────
 
+def _signal_series(df: pd.DataFrame, buy: np.ndarray, sell: np.ndarray) -> pd.Series:
+    """Build an int8 {-1, 0, +1} signal in one pass (sell wins when both fire)."""
+    return pd.Series(
+        np.select([sell, buy], [-1, 1], default=0).astype(np.int8),
+        index=df.index,
+    )
+
+
+@ind.cached
 def strategy_sma_cross(df: pd.DataFrame, fast: int = 10, slow: int = 50) -> pd.Series:
     """SMA crossover: +1 when fast > slow, -1 otherwise."""
-    sma_fast = ind.sma(df, fast)
-    sma_slow = ind.sma(df, slow)
-    signal = pd.Series(0, index=df.index)
-    signal[sma_fast > sma_slow] = 1
-    signal[sma_fast <= sma_slow] = -1
-    return signal
+    sma_fast = ind.sma(df, fast).to_numpy()
+    sma_slow = ind.sma(df, slow).to_numpy()
+    return _signal_series(df, sma_fast > sma_slow, sma_fast <= sma_slow)
 
 
+@ind.cached
 def strategy_rsi_mean_reversion(df: pd.DataFrame, period: int = 14,
                                   oversold: int = 30, overbought: int = 70) -> pd.Series:
     """Buy when RSI < oversold, sell when RSI > overbought."""
-    rsi_val = ind.rsi(df, period)
-    signal = pd.Series(0, index=df.index)
-    signal[rsi_val < oversold] = 1
-    signal[rsi_val > overbought] = -1
-    return signal
+    rsi_val = ind.rsi(df, period).to_numpy()
+    return _signal_series(df, rsi_val < oversold, rsi_val > overbought)
 
 
+@ind.cached
 def strategy_macd_cross(df: pd.DataFrame) -> pd.Series:
     """MACD line crosses signal line."""
     macd_line, signal_line, _ = ind.macd(df)
-    signal = pd.Series(0, index=df.index)
-    signal[macd_line > signal_line] = 1
-    signal[macd_line <= signal_line] = -1
-    return signal
+    macd_line = macd_line.to_numpy()
+    signal_line = signal_line.to_numpy()
+    return _signal_series(df, macd_line > signal_line, macd_line <= signal_line)
 
 
+@ind.cached
 def strategy_bollinger_bounce(df: pd.DataFrame, period: int = 20, std: float = 2.0) -> pd.Series:
     """Buy near lower band, sell near upper band."""
     upper, mid, lower = ind.bollinger_bands(df, period, std)
-    signal = pd.Series(0, index=df.index)
-    signal[df["Close"] <= lower] = 1
-    signal[df["Close"] >= upper] = -1
-    return signal
+    close = df["Close"].to_numpy()
+    return _signal_series(df, close <= lower.to_numpy(), close >= upper.to_numpy())
 
 
+@ind.cached
 def strategy_combined_momentum(df: pd.DataFrame) -> pd.Series:
     """Combined: SMA trend + RSI confirmation."""
-    sma_20 = ind.sma(df, 20)
-    sma_50 = ind.sma(df, 50)
-    rsi_val = ind.rsi(df, 14)
+    close = df["Close"].to_numpy()
+    sma_20 = ind.sma(df, 20).to_numpy()
+    sma_50 = ind.sma(df, 50).to_numpy()
+    rsi_val = ind.rsi(df, 14).to_numpy()
 
-    signal = pd.Series(0, index=df.index)
     # Buy: price above both SMAs AND RSI not overbought
-    buy_cond = (df["Close"] > sma_20) & (sma_20 > sma_50) & (rsi_val < 70)
-    sell_cond = (df["Close"] < sma_20) | (rsi_val > 80)
-    signal[buy_cond] = 1
-    signal[sell_cond] = -1
-    return signal
+    buy_cond = (close > sma_20) & (sma_20 > sma_50) & (rsi_val < 70)
+    sell_cond = (close < sma_20) | (rsi_val > 80)
+    return _signal_series(df, buy_cond, sell_cond)
 
 
 STRATEGIES = {
@@ -118,6 +121,117 @@ STRATEGIES = {
 
 # ── Backtesting engine ───────────────────────────────────────
 
+# Trade action codes emitted by the core loop
+ACTION_BUY, ACTION_SELL, ACTION_SL, ACTION_TP, ACTION_CLOSE = range(5)
+ACTION_LABELS = ("Buy", "Sell", "Sell (SL)", "Sell (TP)", "Sell (Close)")
+
+# One record per fill, preallocated by the core loop
+TRADE_DTYPE = np.dtype([
+    ("idx", np.int64), ("action", np.int8), ("price", np.float64),
+    ("qty", np.int64), ("pnl", np.float64),
+])
+
+
+def _run_backtest_core(
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    signals: np.ndarray,
+    initial_capital: float,
+    commission_rate: float,
+    position_size_pct: float,
+    sl_pct: float,
+    tp_pct: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Trade-by-trade simulation on raw arrays.
+
+    The Python loop runs once per round trip, not once per bar: entries are
+    located with searchsorted over the buy-signal bars, and each in-position
+    segment is scanned with a single vectorized SL/TP test.
+
+    sl_pct / tp_pct: NaN disables the stop-loss / take-profit.
+    Returns (equity, trades) where trades is a TRADE_DTYPE record array.
+    """
+    n = len(close)
+    use_sl = not np.isnan(sl_pct)
+    use_tp = not np.isnan(tp_pct)
+    buy_bars = np.flatnonzero(signals == 1)
+    sell_bars = np.flatnonzero(signals == -1)
+
+    cash = initial_capital
+    equity = np.empty(n, dtype=np.float64)
+    # Every round trip spans at least one bar, except a final entry that is
+    # closed on the same last bar, so n + 1 records is an upper bound
+    trades = np.empty(n + 1, dtype=TRADE_DTYPE)
+    n_trades = 0
+
+    start = 0  # first bar at which we are flat and may enter
+    while start < n:
+        # Next buy signal with enough cash for at least one share
+        k = int(np.searchsorted(buy_bars, start))
+        qty = 0
+        while k < len(buy_bars):
+            entry_bar = int(buy_bars[k])
+            entry_price = float(open_[entry_bar])
+            qty = int(cash * (position_size_pct / 100) / entry_price)
+            if qty > 0:
+                break
+            k += 1
+        if qty <= 0:
+            equity[start:] = cash
+            break
+
+        equity[start:entry_bar] = cash
+        cash -= qty * entry_price * (1 + commission_rate)
+        trades[n_trades] = (entry_bar, ACTION_BUY, entry_price, qty, 0.0)
+        n_trades += 1
+
+        # Signal exit: first sell signal strictly after the entry bar
+        j = int(np.searchsorted(sell_bars, entry_bar + 1))
+        exit_bar = int(sell_bars[j]) if j < len(sell_bars) else n
+        exit_action = ACTION_SELL
+
+        # SL / TP: intra-bar OHLC (Low pour le stop, High pour la cible) up to
+        # and including the signal-exit bar, since they are checked first
+        if use_sl or use_tp:
+            lo, hi = entry_bar + 1, min(exit_bar + 1, n)
+            sl_price = entry_price * (1 - sl_pct / 100)
+            tp_price = entry_price * (1 + tp_pct / 100)
+            sl_hit = low[lo:hi] <= sl_price if use_sl else np.zeros(hi - lo, dtype=bool)
+            tp_hit = high[lo:hi] >= tp_price if use_tp else np.zeros(hi - lo, dtype=bool)
+            hits = sl_hit | tp_hit
+            off = int(np.argmax(hits)) if len(hits) else 0
+            if len(hits) and hits[off]:
+                exit_bar = lo + off
+                exit_action = ACTION_SL if sl_hit[off] else ACTION_TP
+
+        equity[entry_bar:exit_bar] = cash + qty * close[entry_bar:exit_bar]
+
+        if exit_bar >= n:
+            # Close any open position at end
+            exit_bar = n - 1
+            exit_action = ACTION_CLOSE
+            exit_price = float(close[-1])
+        elif exit_action == ACTION_SL:
+            # On est sorti au pire des cas : au prix du SL (ou Open si gap baissier)
+            exit_price = min(float(open_[exit_bar]), sl_price)
+        elif exit_action == ACTION_TP:
+            exit_price = tp_price
+        else:
+            exit_price = float(close[exit_bar])
+
+        revenue = qty * exit_price * (1 - commission_rate)
+        cash += revenue
+        equity[exit_bar] = cash
+        trades[n_trades] = (exit_bar, exit_action, exit_price, qty, revenue - qty * entry_price)
+        n_trades += 1
+        start = exit_bar + 1
+
+    return equity, trades[:n_trades]
+
+
 def run_backtest(
     df: pd.DataFrame,
     signal_fn: Callable,
@@ -132,138 +246,123 @@ def run_backtest(
     Run a vectorized backtest with optional SL/TP.
 
     signal_fn: function(df, **params) → pd.Series of {-1, 0, +1}
+
+    Built-in strategies are memoized per (df, params) like the indicators, so
+    sweeps over capital / commission / sizing / SL-TP on the same frame reuse
+    the signal series instead of recomputing it.
     """
     result = BacktestResult()
 
     signals = signal_fn(df, **strategy_params)
-    signals = signals.fillna(0)
-
-    cash = initial_capital
-    position = 0
-    entry_price = 0.0
-    equity = []
-    trades = []
-
-    for i in range(len(df)):
-        close_price = df["Close"].iloc[i]
-        date = df.index[i]
-        
-        # Intra-bar OHLC pour éviter le Look-Ahead Bias
-        current_high = df["High"].iloc[i]
-        current_low = df["Low"].iloc[i]
-        open_price = df["Open"].iloc[i]
-
-        # Check SL / TP if in position
-        if position > 0:
-            # Stop Loss : On vérifie si le PLUS BAS a touché le stop
-            if stop_loss_pct:
-                sl_price = entry_price * (1 - stop_loss_pct / 100)
-                if current_low <= sl_price:
-                    # On est sorti au pire des cas : au prix du SL (ou Open si gap baissier)
-                    exit_price = min(open_price, sl_price) if i > 0 else sl_price
-                    revenue = position * exit_price * (1 - commission_rate)
-                    pnl = revenue - (position * entry_price)
-                    cash += revenue
-                    trades.append({
-                        "date": str(date), "action": "Sell (SL)", "price": exit_price,
-                        "qty": position, "pnl": round(pnl, 2),
-                    })
-                    position = 0
-                    entry_price = 0
-                    equity.append(cash)
-                    continue
-
-            # Take Profit : On vérifie si le PLUS HAUT a touché la cible
-            if take_profit_pct and position > 0:
-                tp_price = entry_price * (1 + take_profit_pct / 100)
-                if current_high >= tp_price:
-                    revenue = position * tp_price * (1 - commission_rate)
-                    pnl = revenue - (position * entry_price)
-                    cash += revenue
-                    trades.append({
-                        "date": str(date), "action": "Sell (TP)", "price": tp_price,
-                        "qty": position, "pnl": round(pnl, 2),
-                    })
-                    position = 0
-                    entry_price = 0
-                    equity.append(cash)
-                    continue
-
-        sig = signals.iloc[i]
-
-        # Buy signal, no position
-        if sig == 1 and position == 0:
-            invest = cash * (position_size_pct / 100)
-            qty = int(invest / open_price)
-            if qty > 0:
-                cost = qty * open_price * (1 + commission_rate)
-                cash -= cost
-                position = qty
-                entry_price = open_price
-                trades.append({
-                    "date": str(date), "action": "Buy", "price": open_price, "qty": qty, "pnl": 0,
-                })
-
-        # Sell signal, has position
-        elif sig == -1 and position > 0:
-            revenue = position * close_price * (1 - commission_rate)
-            pnl = revenue - (position * entry_price)
-            cash += revenue
-            trades.append({
-                "date": str(date), "action": "Sell", "price": close_price,
-                "qty": position, "pnl": round(pnl, 2),
-            })
-            position = 0
-            entry_price = 0
-
-        equity.append(cash + position * close_price)
-
-    # Close any open position at end
-    if position > 0:
-        price = df["Close"].iloc[-1]
-        revenue = position * price * (1 - commission_rate)
-        pnl = revenue - (position * entry_price)
-        cash += revenue
-        trades.append({
-            "date": str(df.index[-1]), "action": "Sell (Close)", "price": price,
-            "qty": position, "pnl": round(pnl, 2),
-        })
-        equity[-1] = cash
+    signals = signals.fillna(0).to_numpy(dtype=np.int8)
+
+    equity_arr, trade_arr = _run_backtest_core(
+        df["Open"].to_numpy(dtype=np.float64),
+        df["High"].to_numpy(dtype=np.float64),
+        df["Low"].to_numpy(dtype=np.float64),
+        df["Close"].to_numpy(dtype=np.float64),
+        signals,
+        float(initial_capital),
+        float(commission_rate),
+        float(position_size_pct),
+        float(stop_loss_pct) if stop_loss_pct else np.nan,
+        float(take_profit_pct) if take_profit_pct else np.nan,
+    )
+
+    # Materialize the trade log once, from the record array
+    trade_pnls = np.round(trade_arr["pnl"], 2)
+    trade_dates = df.index[trade_arr["idx"]]
+    trades = [
+        {
+            "date": str(date), "action": ACTION_LABELS[action], "price": price,
+            "qty": qty, "pnl": pnl,
+        }
+        for date, action, price, qty, pnl in zip(
+            trade_dates, trade_arr["action"].tolist(), trade_arr["price"].tolist(),
+            trade_arr["qty"].tolist(), trade_pnls.tolist(),
+        )
+    ]
 
     # Compute stats
     result.trades = trades
-    result.equity_curve = equity
+    result.equity_curve = equity_arr
     result.dates = df.index.tolist()
     result.total_trades = len(trades)
 
-    pnls = [t["pnl"] for t in trades if t["action"].startswith("Sell")]
-    if pnls:
-        wins = [p for p in pnls if p > 0]
-        losses_list = [p for p in pnls if p < 0]
-        result.total_pnl = sum(pnls)
+    pnls = trade_pnls[trade_arr["action"] != ACTION_BUY]
+    if len(pnls):
+        wins = pnls[pnls > 0]
+        losses = pnls[pnls < 0]
+        result.total_pnl = float(pnls.sum())
         result.win_rate = len(wins) / len(pnls) * 100
-        result.avg_trade = np.mean(pnls)
-        result.best_trade = max(pnls)
-        result.worst_trade = min(pnls)
-        result.profit_factor = abs(sum(wins) / sum(losses_list)) if losses_list else float("inf")
-
-    result.total_return_pct = (equity[-1] / initial_capital - 1) * 100 if equity else 0
+        result.avg_trade = float(pnls.mean())
+        result.best_trade = float(pnls.max())
+        result.worst_trade = float(pnls.min())
+        result.profit_factor = abs(wins.sum() / losses.sum()) if len(losses) else float("inf")
+
+    result.total_return_pct = (
+        (equity_arr[-1] / initial_capital - 1) * 100 if len(equity_arr) else 0
+    )
     result.buy_hold_return_pct = (df["Close"].iloc[-1] / df["Close"].iloc[0] - 1) * 100
 
     # Max drawdown
-    if equity:
-        peak = equity[0]
-        max_dd = 0
-        for v in equity:
-            peak = max(peak, v)
-            dd = (peak - v) / peak * 100
-            max_dd = max(max_dd, dd)
-        result.max_drawdown = round(max_dd, 2)
+    if len(equity_arr):
+        peak = np.maximum.accumulate(equity_arr)
+        dd = (peak - equity_arr) / peak * 100
+        result.max_drawdown = round(max(float(dd.max()), 0.0), 2)
 
     # Sharpe
-    if len(equity) > 1:
-        returns = pd.Series(equity).pct_change().dropna()
-        if returns.std() > 0:
-            result.sharpe = round(returns.mean() / returns.std() * np.sqrt(252), 2)
+    if len(equity_arr) > 1:
+        returns = np.diff(equity_arr) / equity_arr[:-1]
+        returns = returns[~np.isnan(returns)]
+        if len(returns) > 1 and returns.std(ddof=1) > 0:
+            result.sharpe = round(returns.mean() / returns.std(ddof=1) * np.sqrt(252), 2)
 
     return result
+
+
+def run_backtest_grid(
+    df: pd.DataFrame,
+    signal_fn: Callable,
+    param_grid: Iterable[dict],
+    max_workers: int | None = None,
+    **backtest_params,
+) -> list[BacktestResult]:
+    """
+    Run the same backtest over a grid of strategy parameters.
+
+    param_grid: iterable of strategy-param dicts, e.g. [{"fast": 5, "slow": 50}, ...]
+    backtest_params: forwarded to run_backtest (capital, commission, SL/TP, ...)
+
+    Runs are independent and fanned out over a thread pool; they share the
+    same DataFrame, so indicators common to several runs (e.g. the slow SMA
+    across fast-period variations) are computed once via the indicator memo.
+    Results are returned in grid order.
+    """
+    def _run(params: dict) -> BacktestResult:
+        return run_backtest(df, signal_fn, **backtest_params, **params)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(_run, param_grid))
+
+
+def run_strategies(
+    df: pd.DataFrame,
+    strategies: dict[str, dict],
+    max_workers: int | None = None,
+    **backtest_params,
+) -> dict[str, BacktestResult]:
+    """
+    Run several strategies on the same data, e.g. all of STRATEGIES.
+
+    strategies: {name: {"fn": signal_fn, "params": {...}}}
+    backtest_params: forwarded to run_backtest (capital, commission, SL/TP, ...)
+
+    Fanned out over a thread pool like run_backtest_grid. Results are keyed
+    by name, in the order of *strategies*.
+    """
+    def _run(spec: dict) -> BacktestResult:
+        return run_backtest(df, spec["fn"], **backtest_params, **spec["params"])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(strategies, pool.map(_run, strategies.values())))
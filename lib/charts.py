@@ -4,6 +4,8 @@ Chart builders — reusable Plotly figure factories.
 
 from __future__ import annotations
 
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
@@ -17,6 +19,92 @@ from lib.config import BULL_COLOR, BEAR_COLOR, PROFIT_GREEN, LOSS_RED, SECTOR_CO
 #  Main price chart
 # ──────────────────────────────────────────────────────────────
 
+# Above this many bars SVG rendering bogs down: lines switch to WebGL and
+# candles are merged into at most MAX_CANDLES buckets
+WEBGL_MIN_BARS = 5000
+MAX_CANDLES = 2000
+
+class _FrameKey:
+    """Hashable handle on a DataFrame, compared by content instead of identity."""
+
+    __slots__ = ("df", "_hash")
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._hash = int(pd.util.hash_pandas_object(df, index=True).sum())
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, _FrameKey)
+            and self._hash == other._hash
+            and self.df.equals(other.df)
+        )
+
+
+@lru_cache(maxsize=16)
+def _interned(key: _FrameKey) -> pd.DataFrame:
+    """Return the first-seen DataFrame equal to *key*.
+
+    st.cache_data hands back a fresh copy on every rerun, which defeats the
+    per-DataFrame indicator memo. Interning equal frames lets an overlay
+    toggle reuse the indicators computed on the previous run.
+    """
+    return key.df
+
+
+def _freeze(options: dict) -> tuple:
+    """Hashable form of an overlays/panels dict (lists become tuples)."""
+    return tuple(sorted(
+        (k, tuple(v) if isinstance(v, list) else v) for k, v in options.items()
+    ))
+
+
+def _x_values(index: pd.Index) -> np.ndarray:
+    """Index as a plain array for Plotly x values, converted once per figure.
+
+    Plotly drops UTC offsets and shows wall-clock time, so tz-aware dates
+    are localized away to get a datetime64 array instead of Timestamp objects.
+    """
+    if isinstance(index, pd.DatetimeIndex) and index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy()
+
+
+def _f32(values) -> np.ndarray:
+    """Display-only float32 copy of a series: half the bytes sent to the browser."""
+    return np.asarray(values, dtype=np.float32)
+
+
+def _bull_bear_marker(up: np.ndarray) -> dict:
+    """Per-bar bull/bear coloring as a uint8 array over a two-color scale.
+
+    Plotly sends the codes as a 1-byte typed array instead of one color
+    string per bar.
+    """
+    return dict(
+        color=up.astype(np.uint8),
+        colorscale=[[0, BEAR_COLOR], [1, BULL_COLOR]],
+        cmin=0, cmax=1,
+    )
+
+
+def _bucket_ohlc(x: np.ndarray, df: pd.DataFrame, target: int):
+    """Merge consecutive bars into at most *target* candles (first/max/min/last)."""
+    step = -(-len(df) // target)
+    starts = np.arange(0, len(df), step)
+    ends = np.minimum(starts + step, len(df)) - 1
+    return (
+        x[starts],
+        df["Open"].to_numpy()[starts],
+        np.fmax.reduceat(df["High"].to_numpy(), starts),
+        np.fmin.reduceat(df["Low"].to_numpy(), starts),
+        df["Close"].to_numpy()[ends],
+    )
+
+
 def build_main_chart(
     df: pd.DataFrame,
     overlays: dict,
@@ -24,13 +112,39 @@ def build_main_chart(
     support_resistance: bool = False,
     fib_levels: bool = False,
     pivot: bool = False,
+    fast_render: bool | None = None,
 ) -> go.Figure:
     """
     Build the main candlestick chart with overlays and sub-panels.
 
     overlays: dict of indicator flags & params
     panels: dict of {volume, rsi, macd, stoch_rsi, adx, obv, mfi, ...}
+    fast_render: force WebGL lines and bucketed candles on (True) or off
+        (False); by default they kick in above WEBGL_MIN_BARS bars
+
+    Figures are memoized on (data, options): a rerun with unchanged inputs
+    returns the same figure object, so callers must not mutate it.
     """
+    return _main_chart(
+        _FrameKey(df), _freeze(overlays), _freeze(panels),
+        support_resistance, fib_levels, pivot, fast_render,
+    )
+
+
+@lru_cache(maxsize=8)
+def _main_chart(
+    key: _FrameKey,
+    overlays: tuple,
+    panels: tuple,
+    support_resistance: bool,
+    fib_levels: bool,
+    pivot: bool,
+    fast_render: bool | None,
+) -> go.Figure:
+    df = _interned(key)
+    overlays, panels = dict(overlays), dict(panels)
+    x = _x_values(df.index)
+
     num_rows = 1
     row_heights = [0.55]
     subplot_titles = [""]
@@ -54,103 +168,121 @@ def build_main_chart(
         subplot_titles=subplot_titles,
     )
 
+    large = len(df) > WEBGL_MIN_BARS if fast_render is None else fast_render
+    scatter = go.Scattergl if large else go.Scatter
+
     # ── Candlestick ───────────────────────────────────────────
+    if large:
+        cx, o, h, l, c = _bucket_ohlc(x, df, MAX_CANDLES)
+    else:
+        cx, o, h, l, c = x, df["Open"], df["High"], df["Low"], df["Close"]
     fig.add_trace(go.Candlestick(
-        x=df.index, open=df["Open"], high=df["High"],
-        low=df["Low"], close=df["Close"],
+        x=cx, open=o, high=h, low=l, close=c,
         name="Price", increasing_line_color=BULL_COLOR,
         decreasing_line_color=BEAR_COLOR,
     ), row=1, col=1)
 
     # ── Overlays ──────────────────────────────────────────────
     if overlays.get("sma"):
-        for p in overlays["sma"]:
-            fig.add_trace(go.Scatter(
-                x=df.index, y=ind.sma(df, p),
+        for p, sma_p in ind.sma_multi(df, tuple(overlays["sma"])).items():
+            fig.add_trace(scatter(
+                x=x, y=_f32(sma_p),
                 name=f"SMA {p}", line=dict(width=1.3),
             ), row=1, col=1)
 
     if overlays.get("ema"):
         for p in overlays["ema"]:
-            fig.add_trace(go.Scatter(
-                x=df.index, y=ind.ema(df, p),
+            fig.add_trace(scatter(
+                x=x, y=_f32(ind.ema(df, p)),
                 name=f"EMA {p}", line=dict(width=1.3, dash="dot"),
             ), row=1, col=1)
 
     if overlays.get("bollinger"):
         upper, mid, lower = ind.bollinger_bands(df)
-        fig.add_trace(go.Scatter(x=df.index, y=upper, name="BB+",
+        fig.add_trace(scatter(x=x, y=_f32(upper), name="BB+",
             line=dict(width=1, color="gray", dash="dot")), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=lower, name="BB-",
+        fig.add_trace(scatter(x=x, y=_f32(lower), name="BB-",
             line=dict(width=1, color="gray", dash="dot"),
             fill="tonexty", fillcolor="rgba(128,128,128,0.08)"), row=1, col=1)
 
     if overlays.get("vwap"):
-        fig.add_trace(go.Scatter(x=df.index, y=ind.vwap(df),
+        fig.add_trace(scatter(x=x, y=_f32(ind.vwap(df)),
             name="VWAP", line=dict(width=1.5, color="purple")), row=1, col=1)
 
     if overlays.get("ichimoku"):
         tenkan, kijun, senkou_a, senkou_b, _ = ind.ichimoku(df)
-        fig.add_trace(go.Scatter(x=df.index, y=tenkan, name="Tenkan",
+        fig.add_trace(scatter(x=x, y=_f32(tenkan), name="Tenkan",
             line=dict(width=1, color="#e91e63")), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=kijun, name="Kijun",
+        fig.add_trace(scatter(x=x, y=_f32(kijun), name="Kijun",
             line=dict(width=1, color="#2196f3")), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=senkou_a, name="Senkou A",
+        fig.add_trace(scatter(x=x, y=_f32(senkou_a), name="Senkou A",
             line=dict(width=0.5, color="green")), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=senkou_b, name="Senkou B",
+        fig.add_trace(scatter(x=x, y=_f32(senkou_b), name="Senkou B",
             line=dict(width=0.5, color="red"),
             fill="tonexty", fillcolor="rgba(0,255,0,0.05)"), row=1, col=1)
 
     if overlays.get("keltner"):
         ku, km, kl = ind.keltner_channels(df)
-        fig.add_trace(go.Scatter(x=df.index, y=ku, name="Keltner+",
+        fig.add_trace(scatter(x=x, y=_f32(ku), name="Keltner+",
             line=dict(width=1, color="#ff9800", dash="dash")), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=kl, name="Keltner-",
+        fig.add_trace(scatter(x=x, y=_f32(kl), name="Keltner-",
             line=dict(width=1, color="#ff9800", dash="dash")), row=1, col=1)
 
+    # Horizontal levels are collected and added to the layout in one update
+    levels: list[tuple[float, str, str, float, str]] = []
+
     # Support / Resistance
     if support_resistance:
         supports, resistances = ind.find_support_resistance(df)
-        for s in supports:
-            fig.add_hline(y=s, line_dash="dash", line_color="#4caf50",
-                          opacity=0.4, annotation_text=f"S: {s:.2f}", row=1, col=1)
-        for r in resistances:
-            fig.add_hline(y=r, line_dash="dash", line_color="#f44336",
-                          opacity=0.4, annotation_text=f"R: {r:.2f}", row=1, col=1)
+        levels += [(s, "dash", "#4caf50", 0.4, f"S: {s:.2f}") for s in supports]
+        levels += [(r, "dash", "#f44336", 0.4, f"R: {r:.2f}") for r in resistances]
 
     # Fibonacci
     if fib_levels:
-        high = df["High"].max()
-        low = df["Low"].min()
+        high = np.nanmax(df["High"].to_numpy())
+        low = np.nanmin(df["Low"].to_numpy())
         fibs = ind.fibonacci_retracement(high, low)
         fib_colors = ["#f44336", "#ff9800", "#ffeb3b", "#4caf50", "#2196f3", "#9c27b0", "#607d8b"]
         for (label, level), color in zip(fibs.items(), fib_colors):
-            fig.add_hline(y=level, line_dash="dot", line_color=color, opacity=0.5,
-                          annotation_text=f"Fib {label}: {level}", row=1, col=1)
+            levels.append((level, "dot", color, 0.5, f"Fib {label}: {level}"))
 
     # Pivot points
     if pivot:
         pivots = ind.pivot_points(df)
         for label, level in pivots.items():
             color = "#4caf50" if label.startswith("S") else "#f44336" if label.startswith("R") else "#ffffff"
-            fig.add_hline(y=level, line_dash="dot", line_color=color,
-                          opacity=0.3, annotation_text=f"{label}: {level}", row=1, col=1)
+            levels.append((level, "dot", color, 0.3, f"{label}: {level}"))
+
+    if levels:
+        # Same geometry as add_hline(row=1, col=1) with a top-right label
+        fig.update_layout(
+            shapes=list(fig.layout.shapes) + [
+                dict(type="line", xref="x domain", yref="y", x0=0, x1=1, y0=y, y1=y,
+                     line=dict(dash=dash, color=color), opacity=opacity)
+                for y, dash, color, opacity, _ in levels
+            ],
+            annotations=list(fig.layout.annotations) + [
+                dict(text=text, xref="x domain", yref="y", x=1, y=y,
+                     xanchor="right", yanchor="bottom", showarrow=False)
+                for y, _, _, _, text in levels
+            ],
+        )
 
     # ── Sub-panels ────────────────────────────────────────────
     current_row = 2
 
     for panel_name in panel_order:
         if panel_name == "volume":
-            colors = [BULL_COLOR if c >= o else BEAR_COLOR for o, c in zip(df["Open"], df["Close"])]
-            fig.add_trace(go.Bar(x=df.index, y=df["Volume"], name="Volume",
-                marker_color=colors, opacity=0.7), row=current_row, col=1)
+            up = df["Close"].to_numpy() >= df["Open"].to_numpy()
+            fig.add_trace(go.Bar(x=x, y=_f32(df["Volume"]), name="Volume",
+                marker=_bull_bear_marker(up), opacity=0.7), row=current_row, col=1)
             # Volume SMA
-            fig.add_trace(go.Scatter(x=df.index, y=ind.volume_sma(df, 20),
+            fig.add_trace(scatter(x=x, y=_f32(ind.volume_sma(df, 20)),
                 name="Vol SMA 20", line=dict(width=1, color="yellow")), row=current_row, col=1)
 
         elif panel_name == "rsi":
             rsi_val = ind.rsi(df)
-            fig.add_trace(go.Scatter(x=df.index, y=rsi_val, name="RSI",
+            fig.add_trace(scatter(x=x, y=_f32(rsi_val), name="RSI",
                 line=dict(width=1.5, color="#ab47bc")), row=current_row, col=1)
             fig.add_hline(y=70, line_dash="dot", line_color="red", opacity=0.5, row=current_row, col=1)
             fig.add_hline(y=30, line_dash="dot", line_color="green", opacity=0.5, row=current_row, col=1)
@@ -158,39 +290,38 @@ def build_main_chart(
 
         elif panel_name == "macd":
             ml, sl, hist = ind.macd(df)
-            fig.add_trace(go.Scatter(x=df.index, y=ml, name="MACD",
+            fig.add_trace(scatter(x=x, y=_f32(ml), name="MACD",
                 line=dict(width=1.5, color="#2196f3")), row=current_row, col=1)
-            fig.add_trace(go.Scatter(x=df.index, y=sl, name="Signal",
+            fig.add_trace(scatter(x=x, y=_f32(sl), name="Signal",
                 line=dict(width=1.5, color="#ff9800")), row=current_row, col=1)
-            colors_h = [BULL_COLOR if v >= 0 else BEAR_COLOR for v in hist]
-            fig.add_trace(go.Bar(x=df.index, y=hist, name="Histogram",
-                marker_color=colors_h, opacity=0.6), row=current_row, col=1)
+            fig.add_trace(go.Bar(x=x, y=_f32(hist), name="Histogram",
+                marker=_bull_bear_marker(hist.to_numpy() >= 0), opacity=0.6), row=current_row, col=1)
 
         elif panel_name == "stoch_rsi":
             k, d = ind.stochastic_rsi(df)
-            fig.add_trace(go.Scatter(x=df.index, y=k, name="%K",
+            fig.add_trace(scatter(x=x, y=_f32(k), name="%K",
                 line=dict(width=1.3, color="#2196f3")), row=current_row, col=1)
-            fig.add_trace(go.Scatter(x=df.index, y=d, name="%D",
+            fig.add_trace(scatter(x=x, y=_f32(d), name="%D",
                 line=dict(width=1.3, color="#ff9800")), row=current_row, col=1)
             fig.add_hline(y=80, line_dash="dot", line_color="red", opacity=0.4, row=current_row, col=1)
             fig.add_hline(y=20, line_dash="dot", line_color="green", opacity=0.4, row=current_row, col=1)
 
         elif panel_name == "adx":
             adx_val, plus_di, minus_di = ind.adx(df)
-            fig.add_trace(go.Scatter(x=df.index, y=adx_val, name="ADX",
+            fig.add_trace(scatter(x=x, y=_f32(adx_val), name="ADX",
                 line=dict(width=2, color="white")), row=current_row, col=1)
-            fig.add_trace(go.Scatter(x=df.index, y=plus_di, name="+DI",
+            fig.add_trace(scatter(x=x, y=_f32(plus_di), name="+DI",
                 line=dict(width=1, color=BULL_COLOR)), row=current_row, col=1)
-            fig.add_trace(go.Scatter(x=df.index, y=minus_di, name="-DI",
+            fig.add_trace(scatter(x=x, y=_f32(minus_di), name="-DI",
                 line=dict(width=1, color=BEAR_COLOR)), row=current_row, col=1)
             fig.add_hline(y=25, line_dash="dot", line_color="gray", opacity=0.3, row=current_row, col=1)
 
         elif panel_name == "obv":
-            fig.add_trace(go.Scatter(x=df.index, y=ind.obv(df), name="OBV",
+            fig.add_trace(scatter(x=x, y=_f32(ind.obv(df)), name="OBV",
                 line=dict(width=1.5, color="#00bcd4")), row=current_row, col=1)
 
         elif panel_name == "mfi":
-            fig.add_trace(go.Scatter(x=df.index, y=ind.mfi(df), name="MFI",
+            fig.add_trace(scatter(x=x, y=_f32(ind.mfi(df)), name="MFI",
                 line=dict(width=1.5, color="#ffeb3b")), row=current_row, col=1)
             fig.add_hline(y=80, line_dash="dot", line_color="red", opacity=0.4, row=current_row, col=1)
             fig.add_hline(y=20, line_dash="dot", line_color="green", opacity=0.4, row=current_row, col=1)
@@ -223,9 +354,10 @@ def equity_curve_chart(
     fig = go.Figure()
 
     if equity_data:
-        df_eq = pd.DataFrame(equity_data)
+        # Only the two plotted fields are materialized
+        df_eq = pd.DataFrame.from_records(equity_data, columns=["time", "value"])
         fig.add_trace(go.Scatter(
-            x=df_eq["time"], y=df_eq["value"],
+            x=df_eq["time"], y=df_eq["value"].to_numpy(),
             mode="lines", name="Portfolio",
             fill="tozeroy", fillcolor="rgba(0,200,83,0.1)",
             line=dict(color=PROFIT_GREEN, width=2),
@@ -236,9 +368,9 @@ def equity_curve_chart(
 
     if benchmark_data is not None and not benchmark_data.empty:
         # Normalize benchmark to same starting value
-        bench_norm = benchmark_data["Close"] / benchmark_data["Close"].iloc[0] * initial_balance
+        close = benchmark_data["Close"].to_numpy(dtype=np.float64)
         fig.add_trace(go.Scatter(
-            x=benchmark_data.index, y=bench_norm,
+            x=_x_values(benchmark_data.index), y=close * (initial_balance / close[0]),
             mode="lines", name="S&P 500 (SPY)",
             line=dict(color="#ff9800", width=1.5, dash="dash"),
         ))
@@ -252,12 +384,13 @@ def equity_curve_chart(
     return fig
 
 
-def pnl_distribution_chart(pnls: list[float]) -> go.Figure:
+def pnl_distribution_chart(pnls: np.ndarray | list[float]) -> go.Figure:
     """Bar chart of P&L per trade."""
     fig = go.Figure()
-    colors = [PROFIT_GREEN if p > 0 else LOSS_RED for p in pnls]
+    pnls = np.asarray(pnls, dtype=np.float64)
+    colors = np.where(pnls > 0, PROFIT_GREEN, LOSS_RED)
     fig.add_trace(go.Bar(
-        x=list(range(1, len(pnls) + 1)), y=pnls,
+        x=np.arange(1, len(pnls) + 1), y=pnls,
         marker_color=colors, name="P&L per Trade",
     ))
     fig.add_hline(y=0, line_color="white", opacity=0.3)
@@ -314,15 +447,24 @@ def sector_pie(sector_data: dict[str, float]) -> go.Figure:
 
 
 def correlation_heatmap(corr_matrix: pd.DataFrame) -> go.Figure:
-    """Correlation heatmap."""
+    """Correlation heatmap.
+
+    Memoized on the matrix content like build_main_chart; callers must not
+    mutate the returned figure.
+    """
+    return _correlation_heatmap(_FrameKey(corr_matrix))
+
+
+@lru_cache(maxsize=4)
+def _correlation_heatmap(key: _FrameKey) -> go.Figure:
+    corr_matrix = key.df
     fig = go.Figure(data=go.Heatmap(
         z=corr_matrix.values,
         x=corr_matrix.columns.tolist(),
         y=corr_matrix.index.tolist(),
         colorscale="RdBu_r",
         zmid=0,
-        text=np.round(corr_matrix.values, 2),
-        texttemplate="%{text}",
+        texttemplate="%{z:.2f}",
         textfont={"size": 11},
         hovertemplate="<b>%{x}</b> vs <b>%{y}</b><br>Correlation: %{z:.3f}<extra></extra>",
     ))
@@ -335,7 +477,8 @@ def correlation_heatmap(corr_matrix: pd.DataFrame) -> go.Figure:
 
 
 def backtest_chart(
-    dates, equity_curve: list[float], buy_hold_curve: list[float] | None = None,
+    dates, equity_curve: np.ndarray | list[float],
+    buy_hold_curve: np.ndarray | list[float] | None = None,
     trades: list[dict] | None = None,
 ) -> go.Figure:
     """Backtest equity curve with trade markers."""
@@ -348,7 +491,7 @@ def backtest_chart(
         line=dict(color="#2196f3", width=2),
     ))
 
-    if buy_hold_curve:
+    if buy_hold_curve is not None and len(buy_hold_curve):
         fig.add_trace(go.Scatter(
             x=dates, y=buy_hold_curve,
             mode="lines", name="Buy & Hold",
@@ -356,20 +499,23 @@ def backtest_chart(
         ))
 
     if trades:
-        buys = [t for t in trades if t["action"] == "Buy"]
-        sells = [t for t in trades if t["action"].startswith("Sell")]
-        if buys:
+        actions = np.array([t["action"] for t in trades])
+        trade_dates = np.array([t["date"] for t in trades])
+        trade_prices = np.array([t["price"] for t in trades], dtype=np.float64)
+        buys = actions == "Buy"
+        sells = np.char.startswith(actions, "Sell")
+        if buys.any():
             fig.add_trace(go.Scatter(
-                x=[t["date"] for t in buys],
-                y=[t["price"] for t in buys],
+                x=trade_dates[buys],
+                y=trade_prices[buys],
                 mode="markers", name="Buy",
                 marker=dict(symbol="triangle-up", size=10, color=BULL_COLOR),
                 yaxis="y2",
             ))
-        if sells:
+        if sells.any():
             fig.add_trace(go.Scatter(
-                x=[t["date"] for t in sells],
-                y=[t["price"] for t in sells],
+                x=trade_dates[sells],
+                y=trade_prices[sells],
                 mode="markers", name="Sell",
                 marker=dict(symbol="triangle-down", size=10, color=BEAR_COLOR),
                 yaxis="y2",
@@ -387,15 +533,27 @@ def backtest_chart(
 def multi_timeframe_chart(
     data_dict: dict[str, pd.DataFrame],
 ) -> go.Figure:
-    """Side-by-side candlestick charts for multiple timeframes."""
-    n = len(data_dict)
+    """Side-by-side candlestick charts for multiple timeframes.
+
+    Memoized on the frames' content like build_main_chart; callers must not
+    mutate the returned figure.
+    """
+    return _multi_timeframe_chart(
+        tuple((label, _FrameKey(df)) for label, df in data_dict.items())
+    )
+
+
+@lru_cache(maxsize=4)
+def _multi_timeframe_chart(frames: tuple) -> go.Figure:
+    n = len(frames)
     fig = make_subplots(rows=1, cols=n, shared_yaxes=True,
-                         subplot_titles=list(data_dict.keys()))
+                         subplot_titles=[label for label, _ in frames])
 
-    for i, (label, df) in enumerate(data_dict.items(), 1):
+    for i, (label, key) in enumerate(frames, 1):
+        df = key.df
+        o, h, l, c = df[["Open", "High", "Low", "Close"]].to_numpy(dtype=np.float64).T
         fig.add_trace(go.Candlestick(
-            x=df.index, open=df["Open"], high=df["High"],
-            low=df["Low"], close=df["Close"],
+            x=_x_values(df.index), open=o, high=h, low=l, close=c,
             name=label, increasing_line_color=BULL_COLOR,
             decreasing_line_color=BEAR_COLOR,
         ), row=1, col=i)
@@ -404,10 +562,8 @@ def multi_timeframe_chart(
         height=400, template="plotly_dark",
         margin=dict(l=0, r=0, t=40, b=0),
         showlegend=False,
-        xaxis_rangeslider_visible=False,
+        # Disable all range sliders
+        **{f"xaxis{i if i > 1 else ''}_rangeslider_visible": False for i in range(1, n + 1)},
     )
-    # Disable all range sliders
-    for i in range(1, n + 1):
-        fig.update_xaxes(rangeslider_visible=False, row=1, col=i)
 
     return fig
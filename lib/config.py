@@ -42,16 +42,25 @@ DEFAULT_SPREAD_PCT = 0.0002            # 0.02%
 SHORT_MARGIN_RATIO = 1.5               # 150% margin
 MARGIN_CALL_THRESHOLD = 0.25           # 25% equity left → margin call
 
+# ── Trading goals ─────────────────────────────────────────────
+DEFAULT_GOALS = {
+    "daily_max_trades": 20,
+    "daily_max_loss": 5000.0,
+    "monthly_target_pnl": 10000.0,
+    "max_drawdown_pct": 15.0,
+}
+
 # ── Watchlist ─────────────────────────────────────────────────
 DEFAULT_WATCHLIST = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "NVDA", "META"]
 
 # ── Scanner universes ─────────────────────────────────────────
-SCANNER_SP500_SAMPLE = [
+# A tuple so it can go straight to the cached scan_universe(tickers, ...)
+SCANNER_SP500_SAMPLE = (
     "AAPL", "MSFT", "GOOGL", "AMZN", "NVDA", "META", "TSLA", "BRK-B",
     "JPM", "V", "JNJ", "UNH", "HD", "PG", "MA", "DIS", "PYPL", "NFLX",
     "ADBE", "CRM", "INTC", "CSCO", "PFE", "ABT", "TMO", "NKE", "KO",
     "PEP", "MRK", "XOM", "CVX", "BAC", "WMT", "COST", "AMD", "QCOM",
-]
+)
 
 # ── Sector colors ─────────────────────────────────────────────
 SECTOR_COLORS = {
@@ -83,6 +92,7 @@ LOSS_RED = "#ff1744"
 DATA_DIR = "data"
 SAVE_FILE = f"{DATA_DIR}/lab_state.json"
 BACKUP_PREFIX = f"{DATA_DIR}/backup_"
+CACHE_DIR = f"{DATA_DIR}/cache"
 
 
 @dataclass
@@ -95,16 +105,12 @@ class SessionDefaults:
     equity_curve: list = field(default_factory=list)
     watchlist: list = field(default_factory=lambda: list(DEFAULT_WATCHLIST))
     pending_orders: list = field(default_factory=list)
+    order_seq: int = 0                                # last issued ORD-#### number
     alerts: list = field(default_factory=list)
     commission_rate: float = DEFAULT_COMMISSION_RATE
     slippage_pct: float = DEFAULT_SLIPPAGE_PCT
     spread_pct: float = DEFAULT_SPREAD_PCT
     trade_notes: dict = field(default_factory=dict)   # {trade_index: {note, tags, rating}}
-    goals: dict = field(default_factory=lambda: {
-        "daily_max_trades": 20,
-        "daily_max_loss": 5000.0,
-        "monthly_target_pnl": 10000.0,
-        "max_drawdown_pct": 15.0,
-    })
+    goals: dict = field(default_factory=lambda: dict(DEFAULT_GOALS))
     accounts: dict = field(default_factory=lambda: {"Default": True})
     active_account: str = "Default"
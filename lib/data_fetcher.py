@@ -2,16 +2,103 @@
 Market data fetching — wraps yfinance with caching and error handling.
 """
 
+import functools
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+
 import streamlit as st
 import yfinance as yf
 import pandas as pd
 import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
+from lib.config import CACHE_DIR
 
-@st.cache_data(ttl=60, show_spinner=False)
-def fetch_history(ticker: str, period: str = "3mo", interval: str = "1d") -> pd.DataFrame:
-    """Return OHLCV DataFrame for *ticker*."""
+# Upper bound on concurrent yfinance requests
+MAX_FETCH_WORKERS = 8
+
+# Shared pool for fetches started early in a script run and read later
+_background = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix="yf")
+
+
+# Bar sizes of one day or more; their history changes slowly enough to cache longer
+DAILY_INTERVALS = {"1d", "5d", "1wk", "1mo", "3mo"}
+
+
+def _prune_disk_cache(prefix: str, ttl: int) -> None:
+    """Delete the *prefix* entries under CACHE_DIR older than *ttl* seconds."""
+    cutoff = time.time() - ttl
+    try:
+        with os.scandir(CACHE_DIR) as entries:
+            for entry in entries:
+                if entry.name.startswith(prefix) and entry.name.endswith(".pkl"):
+                    try:
+                        if entry.stat().st_mtime < cutoff:
+                            os.remove(entry.path)
+                    except OSError:
+                        pass
+    except OSError as e:
+        print(f"Erreur nettoyage cache disque: {e}")
+
+
+def _disk_cached(ttl: int):
+    """Pickle results under CACHE_DIR so they survive a restart.
+
+    Sits under st.cache_data, which is in-process only. Entries are
+    considered stale *ttl* seconds after they were written; stale files
+    of the same function are deleted whenever a new entry is written.
+    """
+    def decorator(fn):
+        prefix = f"{fn.__name__}-"
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            digest = hashlib.md5(repr((fn.__name__,) + args).encode()).hexdigest()
+            path = os.path.join(CACHE_DIR, f"{prefix}{digest}.pkl")
+            try:
+                fresh = time.time() - os.path.getmtime(path) < ttl
+            except OSError:
+                fresh = False
+            if fresh:
+                try:
+                    with open(path, "rb") as f:
+                        return pickle.load(f)
+                except Exception as e:
+                    # Truncated file, or a pickle from an older pandas/numpy
+                    print(f"Cache disque illisible {path}: {e}")
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+            result = fn(*args)
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(tmp_path, path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            except Exception as e:
+                print(f"Erreur cache disque {path}: {e}")
+            _prune_disk_cache(prefix, ttl)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _download_history(ticker: str, period: str, interval: str) -> pd.DataFrame:
     t = yf.Ticker(ticker)
     df = t.history(period=period, interval=interval)
     if df.empty:
@@ -19,16 +106,83 @@ def fetch_history(ticker: str, period: str = "3mo", interval: str = "1d") -> pd.
     return df
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _fetch_intraday_history(ticker: str, period: str, interval: str) -> pd.DataFrame:
+    return _download_history(ticker, period, interval)
+
+
+@_disk_cached(ttl=900)
+def _download_daily_history(ticker: str, period: str, interval: str) -> pd.DataFrame:
+    return _download_history(ticker, period, interval)
+
+
+@st.cache_data(ttl=900, show_spinner=False)
+def _fetch_daily_history(ticker: str, period: str, interval: str) -> pd.DataFrame:
+    return _download_daily_history(ticker, period, interval)
+
+
+def fetch_history(ticker: str, period: str = "3mo", interval: str = "1d") -> pd.DataFrame:
+    """Return OHLCV DataFrame for *ticker*.
+
+    Intraday bars are cached for 60 s; daily and longer bars for 15 min,
+    since only the last (still-forming) bar moves between reruns.
+    The ticker is normalized first so "aapl " and "AAPL" share one entry.
+    """
+    ticker = ticker.upper().strip()
+    if interval in DAILY_INTERVALS:
+        return _fetch_daily_history(ticker, period, interval)
+    return _fetch_intraday_history(ticker, period, interval)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_history_batch(
+    tickers: tuple, period: str = "3mo", interval: str = "1d"
+) -> dict[str, pd.DataFrame]:
+    """Return {ticker: OHLCV DataFrame} from a single batched yf.download.
+
+    Each frame only keeps the rows where that ticker traded. Tickers that
+    return no data are left out; input order is kept. Results are also
+    kept on disk for 5 min, so a restarted app does not refetch the universe.
+    """
+    tickers = tuple(dict.fromkeys(t.upper().strip() for t in tickers))
+    if not tickers:
+        return {}
+    try:
+        return _download_history_batch(tickers, period, interval)
+    except Exception as e:
+        print(f"Erreur download {tickers}: {e}")
+        return {}
+
+
+@_disk_cached(ttl=300)
+def _download_history_batch(tickers: tuple, period: str, interval: str) -> dict[str, pd.DataFrame]:
+    # Raises on failure so an empty result is never written to disk
+    data = yf.download(list(tickers), period=period, interval=interval,
+                       group_by="ticker", threads=True, progress=False)
+    if data.empty:
+        raise ValueError(f"No data returned for {tickers}")
+
+    frames = {}
+    grouped = isinstance(data.columns, pd.MultiIndex)
+    available = set(data.columns.get_level_values(0)) if grouped else {tickers[0]}
+    for t in tickers:
+        if t not in available:
+            continue
+        df = (data[t] if grouped else data).dropna(how="all")
+        if not df.empty:
+            frames[t] = df
+    return frames
+
+
 @st.cache_data(ttl=30, show_spinner=False)
 def fetch_info(ticker: str) -> dict:
     """Return the yfinance .info dict (cached 30 s)."""
     return yf.Ticker(ticker).info
 
 
-@st.cache_data(ttl=60)  # Cache réduit à 60 secondes pour le temps réel
-def get_current_price(ticker: str) -> float:
-    """Récupère le tout dernier prix disponible (intraday).
-    
+def _last_price(ticker: str) -> float:
+    """Récupère le tout dernier prix disponible (intraday), sans cache.
+
     Stratégie:
     1. Essaye 1 jour avec interval 1 minute pour la dernière bougie
     2. Fallback à 5 jours si le marché est fermé
@@ -51,26 +205,67 @@ def get_current_price(ticker: str) -> float:
         return 0.0
 
 
+@st.cache_data(ttl=60, show_spinner=False)  # Cache réduit à 60 secondes pour le temps réel
+def get_current_price(ticker: str) -> float:
+    """Récupère le tout dernier prix disponible (intraday)."""
+    return _last_price(ticker)
+
+
+def _last_closes(tickers: tuple, period: str, interval: str) -> dict[str, float]:
+    """Dernier cours de clôture par ticker, en une seule requête yf.download."""
+    try:
+        data = yf.download(list(tickers), period=period, interval=interval,
+                           progress=False, threads=True)
+    except Exception as e:
+        print(f"Erreur download {tickers}: {e}")
+        return {}
+    if data.empty:
+        return {}
+    if isinstance(data.columns, pd.MultiIndex):
+        closes = data["Close"]
+    else:
+        closes = data[["Close"]]
+        closes.columns = list(tickers)
+    last = closes.ffill().iloc[-1]
+    return {t: float(p) for t, p in last.items() if pd.notna(p)}
+
+
 @st.cache_data(ttl=30, show_spinner=False)
 def get_batch_prices(tickers: tuple) -> dict[str, float | None]:
-    """Fetch current prices for a batch of tickers."""
-    prices: dict[str, float | None] = {}
-    for t in tickers:
-        prices[t] = get_current_price(t)
-    return prices
+    """Fetch current prices for a batch of tickers.
+
+    All tickers go out in one batched 1-minute download; the ones without
+    intraday bars (market closed, illiquid) fall back to a second batched
+    daily download. Tickers with no data at all map to 0.0.
+    """
+    if not tickers:
+        return {}
+    prices = _last_closes(tickers, period="1d", interval="1m")
+    missing = tuple(t for t in tickers if t not in prices)
+    if missing:
+        prices.update(_last_closes(missing, period="5d", interval="1d"))
+    return {t: prices.get(t, 0.0) for t in tickers}
+
+
+def _sector(ticker: str) -> str:
+    # Uncached on purpose: runs in worker threads, outside the script-run context
+    try:
+        return yf.Ticker(ticker).info.get("sector", "Other")
+    except Exception:
+        return "Other"
 
 
 @st.cache_data(ttl=300, show_spinner=False)
 def get_sector_info(tickers: tuple) -> dict[str, str]:
-    """Return {ticker: sector} mapping."""
-    mapping: dict[str, str] = {}
-    for t in tickers:
-        try:
-            info = fetch_info(t)
-            mapping[t] = info.get("sector", "Other")
-        except Exception:
-            mapping[t] = "Other"
-    return mapping
+    """Return {ticker: sector} mapping.
+
+    The .info lookups are network-bound and run concurrently.
+    """
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(len(tickers), MAX_FETCH_WORKERS)) as pool:
+        sectors = pool.map(_sector, tickers)
+    return dict(zip(tickers, sectors))
 
 
 @st.cache_data(ttl=600, show_spinner=False)
@@ -94,15 +289,39 @@ def fetch_options_expirations(ticker: str) -> tuple:
     return t.options
 
 
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_news(ticker: str) -> list[dict]:
+    return yf.Ticker(ticker).news or []
+
+
 def fetch_news(ticker: str) -> list[dict]:
-    """Fetch recent news (not cached — lightweight)."""
+    """Fetch recent news. Failures return [] and are not cached."""
     try:
-        t = yf.Ticker(ticker)
-        return t.news or []
+        return _fetch_news(ticker)
     except Exception:
         return []
 
 
+def run_async(fn, *args) -> Future:
+    """Start fn(*args) on the background pool; call .result() where the value is needed.
+
+    The caller's script-run context is attached to the worker, so
+    st.cache_data'd fetchers share their cache with the script thread.
+    """
+    ctx = get_script_run_ctx()
+
+    def task():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+
+    return _background.submit(task)
+
+
+def fetch_news_async(ticker: str) -> Future:
+    """Start fetch_news in the background; call .result() when the news is needed."""
+    return run_async(fetch_news, ticker)
+
+
 @st.cache_data(ttl=120, show_spinner=False)
 def fetch_correlation_data(tickers: tuple, period: str = "6mo") -> pd.DataFrame:
     """Download close prices for multiple tickers and return correlation matrix."""
@@ -112,14 +331,25 @@ def fetch_correlation_data(tickers: tuple, period: str = "6mo") -> pd.DataFrame:
     else:
         closes = data[["Close"]]
         closes.columns = list(tickers)
-    returns = closes.pct_change().dropna()
-    return returns.corr()
+    # Same as closes.pct_change().dropna().corr() (pandas 2.x pads gaps first),
+    # with the correlation done in one np.corrcoef call
+    arr = closes.ffill().to_numpy(dtype=np.float64)
+    returns = np.diff(arr, axis=0) / arr[:-1]
+    returns = returns[~np.isnan(returns).any(axis=1)]
+    corr = np.atleast_2d(np.corrcoef(returns, rowvar=False))
+    return pd.DataFrame(corr, index=closes.columns, columns=closes.columns)
 
 
 @st.cache_data(ttl=120, show_spinner=False)
 def fetch_multi_close(tickers: tuple, period: str = "6mo") -> pd.DataFrame:
-    """Download daily close prices for multiple tickers."""
+    """Download daily close prices for multiple tickers.
+
+    Rows are dropped only when every ticker is missing, so one late listing
+    or holiday mismatch does not truncate the others.
+    """
     data = yf.download(list(tickers), period=period, interval="1d", progress=False)
     if isinstance(data.columns, pd.MultiIndex):
-        return data["Close"].dropna()
-    return data[["Close"]].dropna()
+        closes = data["Close"]
+    else:
+        closes = data["Close"].to_frame(name=tickers[0])
+    return closes.dropna(how="all")
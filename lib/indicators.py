@@ -5,27 +5,97 @@ All functions take a DataFrame with at least OHLCV columns
 and return Series or tuples of Series.
 """
 
+import functools
+import inspect
+import weakref
+
 import pandas as pd
 import numpy as np
 
 
+# ── Per-DataFrame memo ────────────────────────────────────────
+# Indicator results are cached per DataFrame object and evicted when the
+# frame is garbage-collected. Frames are treated as immutable: callers must
+# not mutate a DataFrame (or a returned Series) after computing indicators.
+
+_memo: dict[int, dict] = {}
+
+
+def _evict(df_id: int) -> None:
+    _memo.pop(df_id, None)
+
+
+def cached(fn):
+    """Memoize an indicator on (DataFrame identity, normalized params)."""
+    sig = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(df, *args, **kwargs):
+        bound = sig.bind(df, *args, **kwargs)
+        bound.apply_defaults()
+        key = (fn,) + tuple(bound.arguments.values())[1:]
+
+        df_id = id(df)
+        entry = _memo.get(df_id)
+        if entry is None:
+            # setdefault is atomic, so concurrent first calls share one entry
+            fresh: dict = {}
+            entry = _memo.setdefault(df_id, fresh)
+            if entry is fresh:
+                weakref.finalize(df, _evict, df_id)
+        if key not in entry:
+            entry[key] = fn(df, *args, **kwargs)
+        return entry[key]
+
+    return wrapper
+
+
 # ── Trend ─────────────────────────────────────────────────────
 
+@cached
 def sma(df: pd.DataFrame, period: int = 20) -> pd.Series:
     return df["Close"].rolling(window=period).mean()
 
 
+@cached
+def sma_multi(df: pd.DataFrame, periods: tuple[int, ...]) -> dict[int, pd.Series]:
+    """SMAs for several periods from one shared running sum of Close.
+
+    A window containing NaN yields NaN, as with rolling().mean().
+    """
+    close = df["Close"].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(close)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, close, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+
+    out = {}
+    for p in periods:
+        values = np.full(len(close), np.nan)
+        if p <= len(close):
+            full = (ccount[p:] - ccount[:-p]) == p
+            values[p - 1:] = np.where(full, (csum[p:] - csum[:-p]) / p, np.nan)
+        out[p] = pd.Series(values, index=df.index, name="Close")
+    return out
+
+
+@cached
 def ema(df: pd.DataFrame, period: int = 20) -> pd.Series:
     return df["Close"].ewm(span=period, adjust=False).mean()
 
 
+@cached
 def wma(df: pd.DataFrame, period: int = 20) -> pd.Series:
-    weights = np.arange(1, period + 1)
-    return df["Close"].rolling(window=period).apply(
-        lambda x: np.dot(x, weights) / weights.sum(), raw=True
-    )
+    weights = np.arange(1, period + 1, dtype=np.float64)
+    close = df["Close"].to_numpy(dtype=np.float64)
+    out = np.full(len(close), np.nan)
+    if len(close) >= period:
+        # One matrix-vector product over all windows; NaN inside a window stays NaN
+        windows = np.lib.stride_tricks.sliding_window_view(close, period)
+        out[period - 1:] = windows @ weights / weights.sum()
+    return pd.Series(out, index=df.index, name="Close")
 
 
+@cached
 def vwap(df: pd.DataFrame) -> pd.Series:
     typical = (df["High"] + df["Low"] + df["Close"]) / 3
     cum_tp_vol = (typical * df["Volume"]).cumsum()
@@ -33,6 +103,7 @@ def vwap(df: pd.DataFrame) -> pd.Series:
     return cum_tp_vol / cum_vol
 
 
+@cached
 def ichimoku(df: pd.DataFrame, tenkan: int = 9, kijun: int = 26, senkou_b: int = 52):
     """Returns (tenkan_sen, kijun_sen, senkou_a, senkou_b, chikou)."""
     high_t = df["High"].rolling(tenkan).max()
@@ -54,6 +125,7 @@ def ichimoku(df: pd.DataFrame, tenkan: int = 9, kijun: int = 26, senkou_b: int =
     return tenkan_sen, kijun_sen, senkou_a, senkou_b_line, chikou
 
 
+@cached
 def supertrend(df: pd.DataFrame, period: int = 10, multiplier: float = 3.0):
     """Basic SuperTrend indicator."""
     atr_val = atr(df, period)
@@ -61,36 +133,46 @@ def supertrend(df: pd.DataFrame, period: int = 10, multiplier: float = 3.0):
     upper = hl2 + multiplier * atr_val
     lower = hl2 - multiplier * atr_val
 
-    st_line = pd.Series(index=df.index, dtype=float)
-    direction = pd.Series(index=df.index, dtype=float)
-
-    for i in range(period, len(df)):
-        if df["Close"].iloc[i] > upper.iloc[i - 1]:
-            st_line.iloc[i] = lower.iloc[i]
-            direction.iloc[i] = 1
-        elif df["Close"].iloc[i] < lower.iloc[i - 1]:
-            st_line.iloc[i] = upper.iloc[i]
-            direction.iloc[i] = -1
+    # The recursion runs on plain lists: per-element .iloc access dominated
+    close = df["Close"].to_numpy(dtype=float).tolist()
+    up = upper.to_numpy(dtype=float).tolist()
+    lo = lower.to_numpy(dtype=float).tolist()
+    n = len(close)
+    st_vals = [np.nan] * n
+    dir_vals = [np.nan] * n
+
+    for i in range(period, n):
+        if close[i] > up[i - 1]:
+            st_vals[i] = lo[i]
+            dir_vals[i] = 1.0
+        elif close[i] < lo[i - 1]:
+            st_vals[i] = up[i]
+            dir_vals[i] = -1.0
         else:
-            if direction.iloc[i - 1] == 1:
-                st_line.iloc[i] = max(lower.iloc[i], st_line.iloc[i - 1])
+            if dir_vals[i - 1] == 1:
+                st_vals[i] = max(lo[i], st_vals[i - 1])
             else:
-                st_line.iloc[i] = min(upper.iloc[i], st_line.iloc[i - 1])
-            direction.iloc[i] = direction.iloc[i - 1]
+                st_vals[i] = min(up[i], st_vals[i - 1])
+            dir_vals[i] = dir_vals[i - 1]
 
+    st_line = pd.Series(st_vals, index=df.index, dtype=float)
+    direction = pd.Series(dir_vals, index=df.index, dtype=float)
     return st_line, direction
 
 
 # ── Momentum ──────────────────────────────────────────────────
 
+@cached
 def rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
-    delta = df["Close"].diff()
-    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    delta = df["Close"].diff().to_numpy()
+    # Masks applied on the arrays; NaN deltas (first bar) count as 0 as with Series.where
+    gain = pd.Series(np.where(delta > 0, delta, 0.0), index=df.index).rolling(window=period).mean()
+    loss = pd.Series(np.where(delta < 0, -delta, 0.0), index=df.index).rolling(window=period).mean()
     rs = gain / loss
     return 100 - (100 / (1 + rs))
 
 
+@cached
 def stochastic_rsi(df: pd.DataFrame, rsi_period: int = 14, stoch_period: int = 14,
                     k_smooth: int = 3, d_smooth: int = 3):
     """Returns (%K, %D) of Stochastic RSI."""
@@ -103,24 +185,30 @@ def stochastic_rsi(df: pd.DataFrame, rsi_period: int = 14, stoch_period: int = 1
     return k, d
 
 
+@cached
 def macd(df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9):
     """Returns (macd_line, signal_line, histogram)."""
-    ema_fast = df["Close"].ewm(span=fast, adjust=False).mean()
-    ema_slow = df["Close"].ewm(span=slow, adjust=False).mean()
-    macd_line = ema_fast - ema_slow
+    # Through ema() so the fast/slow EMAs are shared with the overlays
+    macd_line = ema(df, fast) - ema(df, slow)
     signal_line = macd_line.ewm(span=signal, adjust=False).mean()
     histogram = macd_line - signal_line
     return macd_line, signal_line, histogram
 
 
+@cached
 def cci(df: pd.DataFrame, period: int = 20) -> pd.Series:
     """Commodity Channel Index."""
     tp = (df["High"] + df["Low"] + df["Close"]) / 3
     sma_tp = tp.rolling(period).mean()
-    mad = tp.rolling(period).apply(lambda x: np.abs(x - x.mean()).mean(), raw=True)
-    return (tp - sma_tp) / (0.015 * mad)
+    tp_arr = tp.to_numpy(dtype=np.float64)
+    mad = np.full(len(tp_arr), np.nan)
+    if len(tp_arr) >= period:
+        windows = np.lib.stride_tricks.sliding_window_view(tp_arr, period)
+        mad[period - 1:] = np.abs(windows - windows.mean(axis=1, keepdims=True)).mean(axis=1)
+    return (tp - sma_tp) / (0.015 * pd.Series(mad, index=df.index))
 
 
+@cached
 def williams_r(df: pd.DataFrame, period: int = 14) -> pd.Series:
     high = df["High"].rolling(period).max()
     low = df["Low"].rolling(period).min()
@@ -129,6 +217,7 @@ def williams_r(df: pd.DataFrame, period: int = 14) -> pd.Series:
 
 # ── Volatility ────────────────────────────────────────────────
 
+@cached
 def bollinger_bands(df: pd.DataFrame, period: int = 20, std_dev: float = 2.0):
     """Returns (upper, middle, lower)."""
     mid = df["Close"].rolling(window=period).mean()
@@ -138,15 +227,24 @@ def bollinger_bands(df: pd.DataFrame, period: int = 20, std_dev: float = 2.0):
     return upper, mid, lower
 
 
+@cached
+def true_range(df: pd.DataFrame) -> pd.Series:
+    """True Range, shared by every ATR period on the same frame."""
+    high = df["High"].to_numpy(dtype=np.float64)
+    low = df["Low"].to_numpy(dtype=np.float64)
+    prev_close = df["Close"].shift().to_numpy(dtype=np.float64)
+    # fmax skips NaN like DataFrame.max(axis=1), so the first bar keeps High - Low
+    tr = np.fmax.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    return pd.Series(tr, index=df.index)
+
+
+@cached
 def atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """Average True Range."""
-    high_low = df["High"] - df["Low"]
-    high_close = (df["High"] - df["Close"].shift()).abs()
-    low_close = (df["Low"] - df["Close"].shift()).abs()
-    tr = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    return tr.rolling(window=period).mean()
+    return true_range(df).rolling(window=period).mean()
 
 
+@cached
 def keltner_channels(df: pd.DataFrame, ema_period: int = 20, atr_period: int = 14,
                      multiplier: float = 2.0):
     """Returns (upper, middle, lower)."""
@@ -159,36 +257,52 @@ def keltner_channels(df: pd.DataFrame, ema_period: int = 20, atr_period: int = 1
 
 # ── Volume ────────────────────────────────────────────────────
 
+@cached
 def obv(df: pd.DataFrame) -> pd.Series:
     """On-Balance Volume."""
-    direction = np.sign(df["Close"].diff())
-    return (direction * df["Volume"]).cumsum()
-
-
+    close = df["Close"].to_numpy(dtype=np.float64)
+    flow = np.empty(len(close))
+    flow[:1] = np.nan
+    # Signed volume built in place in one buffer
+    np.sign(np.diff(close), out=flow[1:])
+    flow[1:] *= df["Volume"].to_numpy(dtype=np.float64)[1:]
+    # cumsum that skips NaN but leaves them in place, like Series.cumsum()
+    gaps = np.isnan(flow)
+    out = np.cumsum(np.where(gaps, 0.0, flow))
+    out[gaps] = np.nan
+    return pd.Series(out, index=df.index)
+
+
+@cached
 def volume_sma(df: pd.DataFrame, period: int = 20) -> pd.Series:
     return df["Volume"].rolling(period).mean()
 
 
+@cached
 def mfi(df: pd.DataFrame, period: int = 14) -> pd.Series:
     """Money Flow Index."""
     tp = (df["High"] + df["Low"] + df["Close"]) / 3
-    mf = tp * df["Volume"]
-    delta = tp.diff()
-    pos_mf = mf.where(delta > 0, 0).rolling(period).sum()
-    neg_mf = mf.where(delta < 0, 0).rolling(period).sum()
+    mf = (tp * df["Volume"]).to_numpy()
+    delta = tp.diff().to_numpy()
+    pos_mf = pd.Series(np.where(delta > 0, mf, 0.0), index=df.index).rolling(period).sum()
+    neg_mf = pd.Series(np.where(delta < 0, mf, 0.0), index=df.index).rolling(period).sum()
     ratio = pos_mf / neg_mf
     return 100 - (100 / (1 + ratio))
 
 
 # ── Trend Strength ────────────────────────────────────────────
 
+@cached
 def adx(df: pd.DataFrame, period: int = 14):
     """Returns (ADX, +DI, -DI)."""
-    plus_dm = df["High"].diff()
-    minus_dm = -df["Low"].diff()
+    up_move = df["High"].diff().to_numpy()
+    down_move = -df["Low"].diff().to_numpy()
 
-    plus_dm = plus_dm.where((plus_dm > minus_dm) & (plus_dm > 0), 0)
-    minus_dm = minus_dm.where((minus_dm > plus_dm) & (minus_dm > 0), 0)
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    # Compared against the already-masked +DM, as before
+    minus_dm = np.where((down_move > plus_dm) & (down_move > 0), down_move, 0.0)
+    plus_dm = pd.Series(plus_dm, index=df.index)
+    minus_dm = pd.Series(minus_dm, index=df.index)
 
     atr_val = atr(df, period)
     plus_di = 100 * (plus_dm.rolling(period).mean() / atr_val)
@@ -202,16 +316,24 @@ def adx(df: pd.DataFrame, period: int = 14):
 
 def find_support_resistance(df: pd.DataFrame, window: int = 20, num_levels: int = 5):
     """Detect local min/max as support and resistance levels."""
-    highs = df["High"].rolling(window=window, center=True).max()
-    lows = df["Low"].rolling(window=window, center=True).min()
+    high = df["High"].to_numpy(dtype=np.float64)
+    low = df["Low"].to_numpy(dtype=np.float64)
+    if len(high) < window:
+        return [], []
 
-    resistance_mask = df["High"] == highs
-    support_mask = df["Low"] == lows
+    # Centered rolling max/min (same alignment as rolling(center=True))
+    lead = window // 2
+    highs = np.full(len(high), np.nan)
+    lows = np.full(len(low), np.nan)
+    highs[lead:lead + len(high) - window + 1] = (
+        np.lib.stride_tricks.sliding_window_view(high, window).max(axis=1))
+    lows[lead:lead + len(low) - window + 1] = (
+        np.lib.stride_tricks.sliding_window_view(low, window).min(axis=1))
 
-    resistances = df.loc[resistance_mask, "High"].drop_duplicates().sort_values(ascending=False)
-    supports = df.loc[support_mask, "Low"].drop_duplicates().sort_values()
+    resistances = np.unique(high[high == highs])[::-1]
+    supports = np.unique(low[low == lows])
 
-    return supports.head(num_levels).tolist(), resistances.head(num_levels).tolist()
+    return supports[:num_levels].tolist(), resistances[:num_levels].tolist()
 
 
 def pivot_points(df: pd.DataFrame):
@@ -219,7 +341,12 @@ def pivot_points(df: pd.DataFrame):
     if len(df) < 2:
         return {}
     last = df.iloc[-2]  # Use prior bar
-    h, l, c = last["High"], last["Low"], last["Close"]
+    return _pivot_levels(float(last["High"]), float(last["Low"]), float(last["Close"]))
+
+
+@functools.lru_cache(maxsize=256)
+def _pivot_levels(h: float, l: float, c: float) -> dict[str, float]:
+    # Memoized on the bar's values; the returned dict is shared, do not mutate
     pp = (h + l + c) / 3
     return {
         "PP": round(pp, 2),
@@ -235,7 +362,15 @@ def pivot_points(df: pd.DataFrame):
 # ── Fibonacci ─────────────────────────────────────────────────
 
 def fibonacci_retracement(high: float, low: float) -> dict[str, float]:
-    """Calculate Fibonacci retracement levels."""
+    """Calculate Fibonacci retracement levels.
+
+    Memoized on (high, low); the returned dict is shared, do not mutate.
+    """
+    return _fib_levels(float(high), float(low))
+
+
+@functools.lru_cache(maxsize=256)
+def _fib_levels(high: float, low: float) -> dict[str, float]:
     diff = high - low
     levels = {
         "0%": high,
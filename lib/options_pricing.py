@@ -37,24 +37,29 @@ class OptionCalculator:
         self.type = option_type.lower()
 
         # Compute d1 and d2 (Black-Scholes components)
+        self._sqrt_t = np.sqrt(self.T)
         self.d1 = (
             np.log(self.S / self.K) + (self.r + 0.5 * self.sigma**2) * self.T
-        ) / (self.sigma * np.sqrt(self.T))
-        self.d2 = self.d1 - self.sigma * np.sqrt(self.T)
+        ) / (self.sigma * self._sqrt_t)
+        self.d2 = self.d1 - self.sigma * self._sqrt_t
+
+        # Shared by price() and greeks(); puts use N(-d1) and N(-d2)
+        sign = 1.0 if self.type == "call" else -1.0
+        self._cdf_d1 = norm.cdf(sign * self.d1)
+        self._cdf_d2 = norm.cdf(sign * self.d2)
+        self._pdf_d1 = norm.pdf(self.d1)
+        self._discount = self.K * np.exp(-self.r * self.T)
+        self._price = None
 
     def price(self):
         """Calculate option price using Black-Scholes."""
-        if self.type == "call":
-            price = (
-                self.S * norm.cdf(self.d1)
-                - self.K * np.exp(-self.r * self.T) * norm.cdf(self.d2)
-            )
-        else:  # put
-            price = (
-                self.K * np.exp(-self.r * self.T) * norm.cdf(-self.d2)
-                - self.S * norm.cdf(-self.d1)
-            )
-        return max(price, 0.0)
+        if self._price is None:
+            if self.type == "call":
+                price = self.S * self._cdf_d1 - self._discount * self._cdf_d2
+            else:  # put
+                price = self._discount * self._cdf_d2 - self.S * self._cdf_d1
+            self._price = max(price, 0.0)
+        return self._price
 
     def greeks(self):
         """
@@ -66,47 +71,28 @@ class OptionCalculator:
         """
         # Delta: Rate of change of option price with respect to spot price
         if self.type == "call":
-            delta = norm.cdf(self.d1)
+            delta = self._cdf_d1
         else:  # put
-            delta = norm.cdf(self.d1) - 1
+            delta = -self._cdf_d1
 
         # Gamma: Rate of change of delta with respect to spot price
-        gamma = norm.pdf(self.d1) / (self.S * self.sigma * np.sqrt(self.T))
+        gamma = self._pdf_d1 / (self.S * self.sigma * self._sqrt_t)
 
         # Theta: Time decay (per day)
-        term1 = -(self.S * norm.pdf(self.d1) * self.sigma) / (
-            2 * np.sqrt(self.T)
-        )
+        term1 = -(self.S * self._pdf_d1 * self.sigma) / (2 * self._sqrt_t)
         if self.type == "call":
-            theta = (
-                term1
-                - self.r
-                * self.K
-                * np.exp(-self.r * self.T)
-                * norm.cdf(self.d2)
-            )
+            theta = term1 - self.r * self._discount * self._cdf_d2
         else:  # put
-            theta = (
-                term1
-                + self.r
-                * self.K
-                * np.exp(-self.r * self.T)
-                * norm.cdf(-self.d2)
-            )
+            theta = term1 + self.r * self._discount * self._cdf_d2
 
         # Vega: Sensitivity to volatility (per 1% change in volatility)
-        vega = self.S * norm.pdf(self.d1) * np.sqrt(self.T) / 100
+        vega = self.S * self._pdf_d1 * self._sqrt_t / 100
 
         # Rho: Sensitivity to interest rate changes
         if self.type == "call":
-            rho = self.K * self.T * np.exp(-self.r * self.T) * norm.cdf(self.d2)
+            rho = self.T * self._discount * self._cdf_d2
         else:  # put
-            rho = (
-                -self.K
-                * self.T
-                * np.exp(-self.r * self.T)
-                * norm.cdf(-self.d2)
-            )
+            rho = -self.T * self._discount * self._cdf_d2
 
         return {
             "Delta": round(delta, 3),
@@ -126,3 +112,54 @@ class OptionCalculator:
     def time_value(self):
         """Calculate time value (extrinsic value)."""
         return max(self.price() - self.intrinsic_value(), 0.0)
+
+
+def bs_price_greeks(S, K, T, r, sigma, is_call):
+    """
+    Vectorized Black-Scholes price and Greeks over arrays of contracts.
+
+    Same formulas and units as OptionCalculator, but one ufunc pass per
+    quantity instead of one object per contract. Inputs broadcast together.
+
+    Parameters:
+    -----------
+    S, K, T, r, sigma : float or array-like
+        Spot, strike, maturity (years), risk-free rate, volatility
+    is_call : bool or array-like of bool
+        True for calls, False for puts
+
+    Returns:
+    --------
+    dict : Arrays "Price", "Delta", "Gamma", "Theta" (daily),
+           "Vega" (per 1% vol) and "Rho" (per 1% rate), unrounded
+    """
+    S = np.asarray(S, dtype=np.float64)
+    K = np.asarray(K, dtype=np.float64)
+    T = np.asarray(T, dtype=np.float64)
+    T = np.where(T > 0, T, 0.00001)  # Avoid division by zero
+    r = np.asarray(r, dtype=np.float64)
+    sigma = np.asarray(sigma, dtype=np.float64)
+    is_call = np.asarray(is_call, dtype=bool)
+
+    sqrt_t = np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma**2) * T) / (sigma * sqrt_t)
+    d2 = d1 - sigma * sqrt_t
+
+    # Puts use the mirrored arguments: N(-d) = 1 - N(d)
+    sign = np.where(is_call, 1.0, -1.0)
+    cdf_d1 = norm.cdf(sign * d1)
+    cdf_d2 = norm.cdf(sign * d2)
+    pdf_d1 = norm.pdf(d1)
+    discount = K * np.exp(-r * T)
+
+    price = sign * (S * cdf_d1 - discount * cdf_d2)
+    theta = -(S * pdf_d1 * sigma) / (2 * sqrt_t) - sign * r * discount * cdf_d2
+
+    return {
+        "Price": np.maximum(price, 0.0),
+        "Delta": np.where(is_call, cdf_d1, -cdf_d1),
+        "Gamma": pdf_d1 / (S * sigma * sqrt_t),
+        "Theta": theta / 365,
+        "Vega": S * pdf_d1 * sqrt_t / 100,
+        "Rho": sign * T * discount * cdf_d2 / 100,
+    }
@@ -30,12 +30,12 @@ def place_order(
 ) -> dict:
     """Place a pending order. Returns the order dict."""
     order = {
-        "id": f"ORD-{len(st.session_state.pending_orders)+1:04d}",
+        "id": _next_order_id(),
         "ticker": ticker,
         "type": order_type,
         "target_price": target_price,
         "qty": qty,
-        "created": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "created": datetime.now().isoformat(" ", timespec="minutes"),
         "status": "active",
         "trailing_pct": trailing_pct,
         "trailing_amount": trailing_amount,
@@ -43,9 +43,21 @@ def place_order(
         "oco_pair_id": oco_pair_id,
     }
     st.session_state.pending_orders.append(order)
+    _touch_orders()
     return order
 
 
+def _next_order_id() -> str:
+    """Issue a new order id from the session counter; ids are never reused."""
+    seq = st.session_state.get("order_seq", 0) + 1
+    # A loaded save may already hold ids past the counter
+    taken = {o["id"] for o in st.session_state.pending_orders}
+    while f"ORD-{seq:04d}" in taken:
+        seq += 1
+    st.session_state.order_seq = seq
+    return f"ORD-{seq:04d}"
+
+
 def place_oco_bracket(
     ticker: str,
     qty: int,
@@ -82,21 +94,56 @@ def place_trailing_stop(
     return order
 
 
+# ──────────────────────────────────────────────────────────────
+#  Order index
+# ──────────────────────────────────────────────────────────────
+
+def _touch_orders() -> None:
+    """Invalidate the cached order index after the order list changes."""
+    st.session_state._orders_version = st.session_state.get("_orders_version", 0) + 1
+
+
+def _orders_index() -> dict:
+    """
+    Positions in pending_orders grouped by ticker ("by_ticker") and by OCO
+    pair id ("by_oco"). Rebuilt only when the list is replaced (load, cancel)
+    or after a _touch_orders() call.
+    """
+    orders = st.session_state.pending_orders
+    version = st.session_state.get("_orders_version", 0)
+    cached = st.session_state.get("_orders_index")
+    if cached is not None and cached["_source"] is orders and cached["_version"] == version:
+        return cached
+
+    by_ticker: dict[str, list[int]] = {}
+    by_oco: dict[str, list[int]] = {}
+    for i, o in enumerate(orders):
+        by_ticker.setdefault(o["ticker"], []).append(i)
+        if o.get("oco_pair_id"):
+            by_oco.setdefault(o["oco_pair_id"], []).append(i)
+
+    cached = {"_source": orders, "_version": version,
+              "by_ticker": by_ticker, "by_oco": by_oco}
+    st.session_state._orders_index = cached
+    return cached
+
+
 # ──────────────────────────────────────────────────────────────
 #  Order checking / execution
 # ──────────────────────────────────────────────────────────────
 
 def check_pending_orders(current_price: float, ticker: str):
     """Check all pending orders for *ticker* against *current_price*."""
-    executed_indices: list[int] = []
-    cancelled_oco_ids: set[str] = set()
+    orders = st.session_state.pending_orders
+    index = _orders_index()
+    executed_indices: set[int] = set()
 
-    for i, order in enumerate(st.session_state.pending_orders):
-        if order["ticker"] != ticker or order["status"] != "active":
+    for i in index["by_ticker"].get(ticker, ()):
+        order = orders[i]
+        if order["status"] != "active":
             continue
         # Skip if OCO partner already triggered
-        if order.get("oco_pair_id") and order["oco_pair_id"] in cancelled_oco_ids:
-            executed_indices.append(i)
+        if i in executed_indices:
             continue
 
         triggered = False
@@ -141,35 +188,37 @@ def check_pending_orders(current_price: float, ticker: str):
                 st.warning(f"📉 Trailing Stop triggered: {ticker} @ ${current_price:.2f}")
 
         if triggered:
-            executed_indices.append(i)
-            # Cancel OCO partner
+            executed_indices.add(i)
+            # Cancel OCO partner, wherever it sits in the list
             if order.get("oco_pair_id"):
-                cancelled_oco_ids.add(order["oco_pair_id"])
+                executed_indices.update(index["by_oco"][order["oco_pair_id"]])
+
+    # Remove executed and OCO-cancelled orders in one pass (in place, so
+    # references to the list stay valid)
+    if executed_indices:
+        orders[:] = [o for i, o in enumerate(orders) if i not in executed_indices]
+        _touch_orders()
 
-    # Remove executed orders (reverse to preserve indices)
-    for idx in sorted(executed_indices, reverse=True):
-        st.session_state.pending_orders.pop(idx)
 
+def cancel_order(order_id: str):
+    """Cancel a pending order by id. Also cancels OCO partner."""
+    cancel_orders((order_id,))
 
-def cancel_order(index: int):
-    """Cancel a pending order by index. Also cancels OCO partner."""
-    if 0 <= index < len(st.session_state.pending_orders):
-        order = st.session_state.pending_orders[index]
-        oco_id = order.get("oco_pair_id")
 
-        if oco_id:
-            # Remove all orders with this OCO id
-            st.session_state.pending_orders = [
-                o for o in st.session_state.pending_orders
-                if o.get("oco_pair_id") != oco_id
-            ]
-        else:
-            st.session_state.pending_orders.pop(index)
+def cancel_orders(order_ids) -> None:
+    """Cancel pending orders by id, with their OCO partners, in one pass."""
+    orders = st.session_state.pending_orders
+    drop = set(order_ids)
+    oco_ids = {o["oco_pair_id"] for o in orders if o["id"] in drop and o.get("oco_pair_id")}
+    kept = [o for o in orders if o["id"] not in drop and o.get("oco_pair_id") not in oco_ids]
+    if len(kept) != len(orders):
+        orders[:] = kept
+        _touch_orders()
 
 
 def get_active_orders(ticker: str | None = None) -> list[dict]:
     """Return active orders, optionally filtered by ticker."""
-    orders = [o for o in st.session_state.pending_orders if o["status"] == "active"]
+    orders = st.session_state.pending_orders
     if ticker:
-        orders = [o for o in orders if o["ticker"] == ticker]
-    return orders
+        orders = [orders[i] for i in _orders_index()["by_ticker"].get(ticker, ())]
+    return [o for o in orders if o["status"] == "active"]
@@ -11,16 +11,76 @@ from scipy import stats as sp_stats
 
 
 def compute_performance_stats() -> dict:
-    """Full performance statistics dashboard."""
+    """Full performance statistics dashboard.
+
+    Memoized in session state: recomputed only when the trade history,
+    open positions, equity curve or initial balance change. The returned
+    dict is shared between calls and must not be mutated.
+    """
+    ss = st.session_state
+    key = (_history_key(), len(ss.portfolio), _curve_key(), ss.initial_balance)
+    if ss.get("_perf_stats_key") != key:
+        ss._perf_stats = _compute_performance_stats()
+        ss._perf_stats_key = key
+    return ss._perf_stats
+
+
+def _history_key() -> tuple:
+    """Cheap change marker for the trade history (it is only ever appended to)."""
     history = st.session_state.history
-    closed_pnls = [t["pnl"] for t in history if isinstance(t.get("pnl"), (int, float))]
+    last = history[-1] if history else {}
+    return len(history), last.get("date"), last.get("pnl")
+
+
+def _curve_key() -> tuple:
+    """Cheap change marker for the equity curve."""
+    curve = st.session_state.equity_curve
+    return len(curve), curve[-1]["value"] if curve else None
+
+
+def closed_pnl_array() -> np.ndarray:
+    """P&L of every closed trade, in history order, as a read-only array.
+
+    Memoized in session state until the trade history changes.
+    """
+    ss = st.session_state
+    key = _history_key()
+    if ss.get("_closed_pnls_key") != key:
+        pnls = np.fromiter(
+            (t["pnl"] for t in ss.history if isinstance(t.get("pnl"), (int, float))),
+            dtype=np.float64,
+        )
+        pnls.flags.writeable = False
+        ss._closed_pnls = pnls
+        ss._closed_pnls_key = key
+    return ss._closed_pnls
+
+
+def _compute_performance_stats() -> dict:
+    history = st.session_state.history
+
+    # One pass over the history for every per-trade aggregate
+    closed_pnls: list[float] = []
+    commissions = slippage = long_pnl = short_pnl = 0
+    for t in history:
+        commissions += t.get("commission", 0)
+        slippage += t.get("slippage", 0)
+        pnl = t.get("pnl")
+        if pnl is None:
+            continue
+        if isinstance(pnl, (int, float)):
+            closed_pnls.append(pnl)
+        if t["action"] == "Sell":
+            long_pnl += pnl
+        elif t["action"] == "Cover":
+            short_pnl += pnl
 
     result: dict = {}
     result["total_trades"] = len(history)
     result["closed_trades"] = len(closed_pnls)
     result["open_positions"] = len(st.session_state.portfolio)
-    result["total_commissions"] = sum(t.get("commission", 0) for t in history)
-    result["total_slippage"] = sum(t.get("slippage", 0) for t in history)
+    result["total_commissions"] = commissions
+    result["total_slippage"] = slippage
 
     if not closed_pnls:
         result.update({
@@ -33,24 +93,25 @@ def compute_performance_stats() -> dict:
         })
         return result
 
-    wins = [p for p in closed_pnls if p > 0]
-    losses = [p for p in closed_pnls if p < 0]
-    breakeven = [p for p in closed_pnls if p == 0]
-
-    result["win_rate"] = len(wins) / len(closed_pnls) * 100
-    result["total_pnl"] = sum(closed_pnls)
-    result["avg_win"] = np.mean(wins) if wins else 0
-    result["avg_loss"] = np.mean(losses) if losses else 0
-    result["avg_holding_pnl"] = np.mean(closed_pnls)
-    result["best_trade"] = max(closed_pnls)
-    result["worst_trade"] = min(closed_pnls)
-    result["profit_factor"] = abs(sum(wins) / sum(losses)) if losses else float("inf")
+    pnl_arr = np.asarray(closed_pnls, dtype=np.float64)
+    wins = pnl_arr[pnl_arr > 0]
+    losses = pnl_arr[pnl_arr < 0]
+
+    result["win_rate"] = len(wins) / len(pnl_arr) * 100
+    result["total_pnl"] = float(pnl_arr.sum())
+    avg_w = float(wins.mean()) if len(wins) else 0
+    avg_loss = float(losses.mean()) if len(losses) else 0
+    result["avg_win"] = avg_w
+    result["avg_loss"] = avg_loss
+    result["avg_holding_pnl"] = float(pnl_arr.mean())
+    result["best_trade"] = float(pnl_arr.max())
+    result["worst_trade"] = float(pnl_arr.min())
+    result["profit_factor"] = abs(wins.sum() / losses.sum()) if len(losses) else float("inf")
 
     # Expectancy
-    win_prob = len(wins) / len(closed_pnls) if closed_pnls else 0
+    win_prob = len(wins) / len(pnl_arr)
     loss_prob = 1 - win_prob
-    avg_w = np.mean(wins) if wins else 0
-    avg_l = abs(np.mean(losses)) if losses else 0
+    avg_l = abs(avg_loss)
     result["expectancy"] = win_prob * avg_w - loss_prob * avg_l
 
     # Kelly Criterion
@@ -61,14 +122,11 @@ def compute_performance_stats() -> dict:
         result["kelly_pct"] = 0
 
     # Consecutive streaks
-    result["consecutive_wins"] = _max_streak(closed_pnls, positive=True)
-    result["consecutive_losses"] = _max_streak(closed_pnls, positive=False)
+    result["consecutive_wins"], result["consecutive_losses"] = _max_streaks(closed_pnls)
 
     # Long vs short P&L
-    long_trades = [t["pnl"] for t in history if t.get("pnl") is not None and t["action"] in ("Sell",)]
-    short_trades = [t["pnl"] for t in history if t.get("pnl") is not None and t["action"] in ("Cover",)]
-    result["long_pnl"] = sum(long_trades)
-    result["short_pnl"] = sum(short_trades)
+    result["long_pnl"] = long_pnl
+    result["short_pnl"] = short_pnl
 
     # Max Drawdown from equity curve
     result["max_drawdown"] = _max_drawdown()
@@ -76,7 +134,7 @@ def compute_performance_stats() -> dict:
     # Risk-adjusted ratios
     initial = st.session_state.initial_balance
     if len(closed_pnls) > 1:
-        returns = np.array(closed_pnls) / initial
+        returns = pnl_arr / initial
         mean_r = np.mean(returns)
         std_r = np.std(returns)
 
@@ -102,15 +160,12 @@ def _max_drawdown() -> float:
     curve = st.session_state.equity_curve
     if not curve:
         return 0
-    values = [e["value"] for e in curve]
-    peak = values[0]
-    max_dd = 0
-    for v in values:
-        if v > peak:
-            peak = v
-        dd = (peak - v) / peak * 100 if peak > 0 else 0
-        max_dd = max(max_dd, dd)
-    return round(max_dd, 2)
+    values = np.fromiter((e["value"] for e in curve), dtype=np.float64, count=len(curve))
+    peaks = np.maximum.accumulate(values)
+    positive = peaks > 0
+    dd = np.zeros_like(values)
+    np.divide(peaks - values, peaks, out=dd, where=positive)
+    return round(max(0.0, float(dd.max()) * 100), 2)
 
 
 def current_drawdown() -> float:
@@ -124,17 +179,22 @@ def current_drawdown() -> float:
     return round((peak - current) / peak * 100, 2) if peak > 0 else 0
 
 
-def _max_streak(pnls: list[float], positive: bool = True) -> int:
-    """Count max consecutive wins or losses."""
-    max_s = 0
-    current = 0
+def _max_streaks(pnls: list[float]) -> tuple[int, int]:
+    """Max consecutive wins and max consecutive losses, in one pass."""
+    max_w = max_l = 0
+    cur_w = cur_l = 0
     for p in pnls:
-        if (positive and p > 0) or (not positive and p < 0):
-            current += 1
-            max_s = max(max_s, current)
+        if p > 0:
+            cur_w += 1
+            cur_l = 0
+            max_w = max(max_w, cur_w)
+        elif p < 0:
+            cur_l += 1
+            cur_w = 0
+            max_l = max(max_l, cur_l)
         else:
-            current = 0
-    return max_s
+            cur_w = cur_l = 0
+    return max_w, max_l
 
 
 # ──────────────────────────────────────────────────────────────
@@ -145,28 +205,44 @@ def compute_var(confidence: float = 0.95) -> dict:
     """
     Value at Risk — historical and parametric.
     Based on daily P&L from equity curve.
+
+    Memoized per confidence level until the equity curve changes; the
+    returned dict must not be mutated.
     """
+    ss = st.session_state
+    key = _curve_key()
+    if ss.get("_var_key") != key:
+        ss._var = {}
+        ss._var_key = key
+    if confidence not in ss._var:
+        ss._var[confidence] = _compute_var(confidence)
+    return ss._var[confidence]
+
+
+def _compute_var(confidence: float) -> dict:
     curve = st.session_state.equity_curve
     if len(curve) < 3:
         return {"historical_var": 0, "parametric_var": 0, "cvar": 0}
 
-    values = [e["value"] for e in curve]
-    returns = pd.Series(values).pct_change().dropna()
+    values = np.fromiter((e["value"] for e in curve), dtype=np.float64, count=len(curve))
+    returns = np.diff(values) / values[:-1]
+    returns = returns[~np.isnan(returns)]
 
     if len(returns) < 2:
         return {"historical_var": 0, "parametric_var": 0, "cvar": 0}
 
     portfolio_value = values[-1]
 
-    # Historical VaR
-    hist_var = np.percentile(returns, (1 - confidence) * 100) * portfolio_value
+    # Historical VaR (np.percentile selects with a partition, no full sort;
+    # the threshold is shared with CVaR below)
+    threshold = np.percentile(returns, (1 - confidence) * 100)
+    hist_var = threshold * portfolio_value
 
     # Parametric VaR (assumes normal distribution)
     z = sp_stats.norm.ppf(1 - confidence)
-    param_var = (returns.mean() + z * returns.std()) * portfolio_value
+    param_var = (returns.mean() + z * returns.std(ddof=1)) * portfolio_value
 
     # Conditional VaR (Expected Shortfall)
-    threshold = np.percentile(returns, (1 - confidence) * 100)
     tail_returns = returns[returns <= threshold]
     cvar = tail_returns.mean() * portfolio_value if len(tail_returns) > 0 else hist_var
 
@@ -201,9 +277,18 @@ def kelly_criterion(win_rate: float, avg_win: float, avg_loss: float) -> float:
 
 
 def get_trade_distribution() -> dict:
-    """Trade P&L distribution stats."""
-    pnls = [t["pnl"] for t in st.session_state.history if isinstance(t.get("pnl"), (int, float))]
-    if not pnls:
+    """Trade P&L distribution stats, memoized until the history changes."""
+    ss = st.session_state
+    key = _history_key()
+    if ss.get("_trade_dist_key") != key:
+        ss._trade_dist = _trade_distribution()
+        ss._trade_dist_key = key
+    return ss._trade_dist
+
+
+def _trade_distribution() -> dict:
+    pnls = closed_pnl_array()
+    if not len(pnls):
         return {"mean": 0, "median": 0, "std": 0, "skew": 0, "kurtosis": 0}
     s = pd.Series(pnls)
     return {
@@ -2,8 +2,10 @@
 Persistence — save / load session state to JSON files.
 """
 
+import gzip
 import json
 import os
+import tempfile
 from datetime import datetime
 from pathlib import Path
 
@@ -14,7 +16,7 @@ from lib.config import DATA_DIR, SAVE_FILE, BACKUP_PREFIX
 # Keys that should be persisted
 PERSIST_KEYS = [
     "balance", "initial_balance", "portfolio", "history",
-    "equity_curve", "watchlist", "pending_orders", "alerts",
+    "equity_curve", "watchlist", "pending_orders", "order_seq", "alerts",
     "commission_rate", "slippage_pct", "spread_pct",
     "trade_notes", "goals", "accounts", "active_account",
 ]
@@ -34,31 +36,53 @@ def save_state(filepath: str | None = None) -> str:
             data[key] = st.session_state[key]
     data["_saved_at"] = datetime.now().isoformat()
     data["_version"] = "2.0.0"
-    with open(filepath, "w") as f:
-        json.dump(data, f, indent=2, default=str)
+    # Compact output: with indent set, json falls back to its pure-Python encoder
+    content = json.dumps(data, separators=(",", ":"), default=str).encode()
+    if filepath.endswith(".gz"):
+        content = gzip.compress(content, compresslevel=3)
+    _atomic_write(filepath, content)
     return filepath
 
 
+def _atomic_write(filepath: str, content: bytes):
+    """Write to a temp file in the same directory, then swap it in.
+
+    A crash or a concurrent reader never sees a half-written state file.
+    """
+    directory = os.path.dirname(filepath) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
 def load_state(filepath: str | None = None) -> bool:
-    """Load state from JSON into session_state. Returns True on success."""
+    """Load state from JSON (plain or .gz) into session_state. Returns True on success."""
     filepath = filepath or SAVE_FILE
     if not os.path.exists(filepath):
         return False
+    opener = gzip.open if filepath.endswith(".gz") else open
     try:
-        with open(filepath) as f:
+        with opener(filepath, "rt") as f:
             data = json.load(f)
         for key in PERSIST_KEYS:
             if key in data:
                 st.session_state[key] = data[key]
         return True
-    except (json.JSONDecodeError, KeyError):
+    except (json.JSONDecodeError, KeyError, gzip.BadGzipFile, EOFError):
         return False
 
 
 def create_backup() -> str:
-    """Create a timestamped backup."""
+    """Create a timestamped, gzip-compressed backup."""
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    path = f"{BACKUP_PREFIX}{ts}.json"
+    path = f"{BACKUP_PREFIX}{ts}.json.gz"
     return save_state(path)
 
 
@@ -66,7 +90,8 @@ def list_backups() -> list[str]:
     """Return sorted list of backup files."""
     _ensure_dir()
     backups = sorted(
-        [f for f in os.listdir(DATA_DIR) if f.startswith("backup_") and f.endswith(".json")],
+        [f for f in os.listdir(DATA_DIR)
+         if f.startswith("backup_") and f.endswith((".json", ".json.gz"))],
         reverse=True,
     )
     return [os.path.join(DATA_DIR, b) for b in backups]
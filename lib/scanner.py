@@ -4,11 +4,18 @@ Market scanner — screen stocks by technical criteria.
 
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from lib import indicators as ind
-from lib.data_fetcher import fetch_history, get_current_price
+from lib.data_fetcher import fetch_history_batch, get_current_price
+
+
+# SMA periods offered by the Scanner page; others are computed on demand
+_SMA_PERIODS = (20, 50, 100, 200)
+
+_indicator_cache: dict[tuple, dict] = {}
+_INDICATOR_CACHE_MAX = 4096
 
 
 @st.cache_data(ttl=300, show_spinner="Scanning market...")
@@ -30,107 +37,199 @@ def scan_universe(
       - macd_bullish: bool
       - bb_oversold: bool
     """
-    results = []
-
-    for ticker in tickers:
-        try:
-            df = fetch_history(ticker, period="3mo", interval="1d")
-            if len(df) < 30:
-                continue
-
-            price = df["Close"].iloc[-1]
-            rsi_val = ind.rsi(df).iloc[-1]
-            vol_avg = ind.volume_sma(df, 20).iloc[-1]
-            vol_today = df["Volume"].iloc[-1]
-            sma_20 = ind.sma(df, 20).iloc[-1]
-            sma_50 = ind.sma(df, 50).iloc[-1]
-            sma_200 = ind.sma(df, 200).iloc[-1] if len(df) >= 200 else None
-            macd_line, signal_line, _ = ind.macd(df)
-            upper, mid, lower = ind.bollinger_bands(df)
-
-            entry = {
-                "ticker": ticker,
-                "price": round(price, 2),
-                "rsi": round(rsi_val, 1) if pd.notna(rsi_val) else None,
-                "sma_20": round(sma_20, 2) if pd.notna(sma_20) else None,
-                "sma_50": round(sma_50, 2) if pd.notna(sma_50) else None,
-                "sma_200": round(sma_200, 2) if sma_200 and pd.notna(sma_200) else None,
-                "volume": int(vol_today),
-                "vol_ratio": round(vol_today / vol_avg, 2) if vol_avg > 0 else 0,
-                "macd_bullish": bool(macd_line.iloc[-1] > signal_line.iloc[-1]),
-                "bb_position": "oversold" if price <= lower.iloc[-1]
-                    else "overbought" if price >= upper.iloc[-1]
-                    else "neutral",
-                "change_1d": round(
-                    (price / df["Close"].iloc[-2] - 1) * 100, 2
-                ) if len(df) > 1 else 0,
-            }
-
-            # Apply filters
-            if criteria.get("rsi_below") and (entry["rsi"] is None or entry["rsi"] >= criteria["rsi_below"]):
-                continue
-            if criteria.get("rsi_above") and (entry["rsi"] is None or entry["rsi"] <= criteria["rsi_above"]):
-                continue
-            if criteria.get("above_sma"):
-                p = criteria["above_sma"]
-                sma_val = ind.sma(df, p).iloc[-1]
-                if pd.isna(sma_val) or price <= sma_val:
-                    continue
-            if criteria.get("below_sma"):
-                p = criteria["below_sma"]
-                sma_val = ind.sma(df, p).iloc[-1]
-                if pd.isna(sma_val) or price >= sma_val:
-                    continue
-            if criteria.get("volume_surge") and entry["vol_ratio"] < criteria["volume_surge"]:
-                continue
-            if criteria.get("price_min") and price < criteria["price_min"]:
-                continue
-            if criteria.get("price_max") and price > criteria["price_max"]:
-                continue
-            if criteria.get("macd_bullish") and not entry["macd_bullish"]:
-                continue
-            if criteria.get("bb_oversold") and entry["bb_position"] != "oversold":
-                continue
-
-            results.append(entry)
-
-        except Exception:
-            continue
-
-    return results
+    # The whole universe comes back from one batched download
+    histories = {
+        t: df for t, df in fetch_history_batch(tickers, period="3mo", interval="1d").items()
+        if len(df) >= 30
+    }
+    if not histories:
+        return []
+
+    # One wide frame per field, right-aligned on the latest bar, so every
+    # indicator below is a single column-wise pass over the whole universe
+    close = _stack(histories, "Close")
+    volume = _stack(histories, "Volume")
+
+    # Cheap filters first (last bar only): the rolling indicators below
+    # are then computed for the surviving tickers alone
+    price = close.iloc[-1]
+    vol_today = volume.iloc[-1]
+    vol_avg = volume.rolling(20).mean().iloc[-1]
+    vol_ratio = (vol_today / vol_avg).round(2).where(vol_avg > 0, 0.0)
+
+    keep = vol_today.notna()
+    if criteria.get("volume_surge"):
+        keep &= ~(vol_ratio < criteria["volume_surge"])
+    if criteria.get("price_min"):
+        keep &= ~(price < criteria["price_min"])
+    if criteria.get("price_max"):
+        keep &= ~(price > criteria["price_max"])
+    if not keep.any():
+        return []
+    close = close.loc[:, keep]
+    price, vol_today, vol_ratio = price[keep], vol_today[keep], vol_ratio[keep]
+
+    # Indicators are cached per ticker on a fingerprint of its bars, so a
+    # rerun that only changes the criteria computes nothing new
+    fingerprints = {
+        t: (t, histories[t].index[-1], len(histories[t]), price[t]) for t in close.columns
+    }
+    # Read into a local dict: another session's scan may clear the shared cache
+    values = {t: _indicator_cache.get(fingerprints[t]) for t in close.columns}
+    missing = [t for t, v in values.items() if v is None]
+    if missing:
+        fresh = _indicators(close[missing]).to_dict("index")
+        if len(_indicator_cache) > _INDICATOR_CACHE_MAX:
+            _indicator_cache.clear()
+        for t, v in fresh.items():
+            _indicator_cache[fingerprints[t]] = v
+        values.update(fresh)
+    inds = pd.DataFrame.from_dict(values, orient="index")
+
+    smas = {p: inds[f"sma_{p}"] for p in _SMA_PERIODS}
+    for key in ("above_sma", "below_sma"):
+        p = criteria.get(key)
+        if p and p not in smas:
+            smas[p] = close.rolling(p).mean().iloc[-1]
+    rsi_val = inds["rsi"]
+    macd_bullish = inds["macd_bullish"]
+    upper, lower = inds["bb_upper"], inds["bb_lower"]
+
+    table = pd.DataFrame({
+        "ticker": close.columns,
+        "price": price.round(2),
+        "rsi": rsi_val,
+        "sma_20": smas[20].round(2),
+        "sma_50": smas[50].round(2),
+        "sma_200": smas[200].round(2),
+        "volume": vol_today,
+        "vol_ratio": vol_ratio,
+        "macd_bullish": macd_bullish,
+        "bb_position": np.select([price <= lower, price >= upper],
+                                 ["oversold", "overbought"], "neutral"),
+        "change_1d": ((price / close.iloc[-2] - 1) * 100).round(2),
+    })
+
+    # Indicator filters as masks over the survivors
+    keep = pd.Series(True, index=close.columns)
+    if criteria.get("rsi_below"):
+        keep &= ~(rsi_val.isna() | (rsi_val >= criteria["rsi_below"]))
+    if criteria.get("rsi_above"):
+        keep &= ~(rsi_val.isna() | (rsi_val <= criteria["rsi_above"]))
+    if criteria.get("above_sma"):
+        sma_val = smas[criteria["above_sma"]]
+        keep &= ~(sma_val.isna() | (price <= sma_val))
+    if criteria.get("below_sma"):
+        sma_val = smas[criteria["below_sma"]]
+        keep &= ~(sma_val.isna() | (price >= sma_val))
+    if criteria.get("macd_bullish"):
+        keep &= macd_bullish
+    if criteria.get("bb_oversold"):
+        keep &= table["bb_position"] == "oversold"
+
+    table = table[keep].astype({"volume": int})
+    for col in ("rsi", "sma_20", "sma_50", "sma_200"):
+        table[col] = table[col].astype(object).where(table[col].notna(), None)
+    return table.to_dict("records")
+
+
+def _indicators(close: pd.DataFrame) -> pd.DataFrame:
+    """Last-bar indicator values per ticker (one row per column of *close*)."""
+    smas = {p: close.rolling(p).mean().iloc[-1] for p in _SMA_PERIODS}
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0.0).rolling(14).mean().iloc[-1]
+    loss = (-delta).where(delta < 0, 0.0).rolling(14).mean().iloc[-1]
+
+    macd_line = (close.ewm(span=12, adjust=False).mean()
+                 - close.ewm(span=26, adjust=False).mean())
+
+    bb_std = close.rolling(20).std().iloc[-1]
+    return pd.DataFrame({
+        "rsi": (100 - 100 / (1 + gain / loss)).round(1),
+        **{f"sma_{p}": sma for p, sma in smas.items()},
+        "macd_bullish": macd_line.iloc[-1] > macd_line.ewm(span=9, adjust=False).mean().iloc[-1],
+        "bb_upper": smas[20] + 2 * bb_std,
+        "bb_lower": smas[20] - 2 * bb_std,
+    })
+
+
+def _stack(histories: dict[str, pd.DataFrame], column: str) -> pd.DataFrame:
+    """One column per ticker, NaN-padded at the top so all series end on the last row."""
+    n = max(len(df) for df in histories.values())
+    return pd.DataFrame({
+        t: np.pad(df[column].to_numpy(dtype=np.float64), (n - len(df), 0), constant_values=np.nan)
+        for t, df in histories.items()
+    })
 
 
 # ── Alert system ──────────────────────────────────────────────
 
+_ABOVE_CONDITIONS = ("above", "cross_above")
+_BELOW_CONDITIONS = ("below", "cross_below")
+
+
+def _touch_alerts() -> None:
+    """Invalidate the cached alert arrays after the alert list changes."""
+    st.session_state._alerts_version = st.session_state.get("_alerts_version", 0) + 1
+
+
+def _alerts_arrays() -> dict:
+    """
+    Trigger price and direction of every alert as NumPy arrays, plus the
+    alert positions grouped by ticker ("by_ticker"). Rebuilt only when the
+    list is replaced (load, trigger) or after a _touch_alerts() call.
+    """
+    ss = st.session_state
+    alerts = ss.get("alerts", [])
+    version = ss.get("_alerts_version", 0)
+    cached = ss.get("_alerts_arrays")
+    if cached is not None and cached["_source"] is alerts and cached["_version"] == version:
+        return cached
+
+    by_ticker: dict[str, list[int]] = {}
+    for i, a in enumerate(alerts):
+        by_ticker.setdefault(a["ticker"], []).append(i)
+
+    conditions = [a["condition"] for a in alerts]
+    cached = {
+        "_source": alerts, "_version": version,
+        "by_ticker": {t: np.array(idx) for t, idx in by_ticker.items()},
+        "price": np.array([a["price"] for a in alerts], dtype=np.float64),
+        "above": np.isin(conditions, _ABOVE_CONDITIONS),
+        "below": np.isin(conditions, _BELOW_CONDITIONS),
+    }
+    ss._alerts_arrays = cached
+    return cached
+
+
 def check_alerts(ticker: str, current_price: float) -> list[str]:
     """Check price alerts and return triggered messages."""
+    arr = _alerts_arrays()
+    # Only this ticker's alerts are looked at; most tickers have none
+    idx = arr["by_ticker"].get(ticker)
+    if idx is None:
+        return []
+    price = arr["price"][idx]
+    fired = idx[
+        (arr["above"][idx] & (current_price >= price))
+        | (arr["below"][idx] & (current_price <= price))
+    ]
+    if not len(fired):
+        return []
+
+    ss = st.session_state
+    alerts = ss.alerts
     triggered = []
-    remaining = []
-
-    for alert in st.session_state.get("alerts", []):
-        if alert["ticker"] != ticker:
-            remaining.append(alert)
-            continue
-
-        fire = False
-        if alert["condition"] == "above" and current_price >= alert["price"]:
-            fire = True
-        elif alert["condition"] == "below" and current_price <= alert["price"]:
-            fire = True
-        elif alert["condition"] == "cross_above" and current_price >= alert["price"]:
-            fire = True
-        elif alert["condition"] == "cross_below" and current_price <= alert["price"]:
-            fire = True
-
-        if fire:
-            triggered.append(
-                f"🔔 Alert: {ticker} is {'above' if 'above' in alert['condition'] else 'below'} "
-                f"${alert['price']:.2f} (current: ${current_price:.2f}) — {alert.get('note', '')}"
-            )
-        else:
-            remaining.append(alert)
-
-    st.session_state.alerts = remaining
+    for i in fired:
+        alert = alerts[i]
+        triggered.append(
+            f"🔔 Alert: {ticker} is {'above' if 'above' in alert['condition'] else 'below'} "
+            f"${alert['price']:.2f} (current: ${current_price:.2f}) — {alert.get('note', '')}"
+        )
+
+    fired_set = set(fired.tolist())
+    ss.alerts = [a for i, a in enumerate(alerts) if i not in fired_set]
     return triggered
 
 
@@ -142,3 +241,4 @@ def add_alert(ticker: str, condition: str, price: float, note: str = ""):
         "price": price,
         "note": note,
     })
+    _touch_alerts()
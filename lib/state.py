@@ -3,23 +3,32 @@ Session state initialization and helpers for Trading Lab Pro.
 """
 
 import streamlit as st
-from dataclasses import asdict
+from dataclasses import fields
 from lib.config import SessionDefaults
 
+_DEFAULT_KEYS = tuple(f.name for f in fields(SessionDefaults))
+
 
 def init_session_state():
-    """Initialize all session-state keys with defaults (idempotent)."""
-    defaults = asdict(SessionDefaults())
-    for key, val in defaults.items():
-        if key not in st.session_state:
-            st.session_state[key] = val
+    """Initialize all session-state keys with defaults (idempotent).
+
+    Runs on every page load; once the session is populated it is a key scan
+    and no default containers are built.
+    """
+    missing = [key for key in _DEFAULT_KEYS if key not in st.session_state]
+    if not missing:
+        return
+    # A fresh instance already owns fresh containers, no deep copy needed
+    defaults = SessionDefaults()
+    for key in missing:
+        st.session_state[key] = getattr(defaults, key)
 
 
 def reset_session_state():
     """Hard-reset all session state to defaults."""
-    defaults = asdict(SessionDefaults())
-    for key, val in defaults.items():
-        st.session_state[key] = val
+    defaults = SessionDefaults()
+    for key in _DEFAULT_KEYS:
+        st.session_state[key] = getattr(defaults, key)
 
 
 def get(key: str, default=None):
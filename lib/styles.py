@@ -2,6 +2,8 @@
 Custom CSS styles for Trading Lab Pro.
 """
 
+import re
+
 MAIN_CSS = """
 <style>
     /* ── Global ─────────────────────────────────────────── */
@@ -68,3 +70,13 @@ MAIN_CSS = """
     .stat-label { font-size: 13px; color: rgba(255,255,255,0.6); margin-top: 4px; }
 </style>
 """
+
+
+def _minify(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", css).strip()
+
+
+# Re-sent by st.markdown on every rerun of every page, so ship it minified
+MAIN_CSS = _minify(MAIN_CSS)
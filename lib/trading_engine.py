@@ -1,41 +1,78 @@
 """
-Trading engine — execute trades with realistic slippage, commissions, and decimal precision.
+Trading engine — execute trades with realistic slippage and commissions.
 Supports both stocks and options trading.
 """
 
-from decimal import Decimal, getcontext
 from typing import Optional, List, Dict, Any
 import numpy as np
 import streamlit as st
 from datetime import datetime
 
-# Configuration de la précision financière
-getcontext().prec = 28
-D = Decimal
 
+# Tirages de slippage faits par blocs: un trade lit le suivant au lieu
+# d'appeler np.random.normal à chaque fois
+_SLIP_STD = 0.0005
+_SLIP_BLOCK = 1 << 16
+_slip_rng = np.random.default_rng()
+_slip_draws: List[float] = []
+_slip_idx = 0
 
-def _to_decimal(val: Any) -> Decimal:
-    """Helper pour convertir float -> Decimal proprement"""
-    return D(str(val)) if val is not None else D(0)
 
+def _refill_slippage(n: int = _SLIP_BLOCK) -> None:
+    global _slip_draws, _slip_idx
+    _slip_draws = _slip_rng.normal(0, _SLIP_STD, size=n).tolist()
+    _slip_idx = 0
 
-def _apply_slippage(price: Decimal, side: str, volatility: float = 0.01) -> Decimal:
+
+def seed_slippage(seed: Optional[int] = None, n: int = _SLIP_BLOCK) -> None:
+    """Réinitialise les tirages de slippage (seed fixe → fills reproductibles)."""
+    global _slip_rng
+    _slip_rng = np.random.default_rng(seed)
+    _refill_slippage(n)
+
+
+def _next_slip_factor() -> float:
+    global _slip_idx
+    if _slip_idx >= len(_slip_draws):
+        _refill_slippage()
+    factor = _slip_draws[_slip_idx]
+    _slip_idx += 1
+    return factor
+
+
+def _notify(level: str, message: str) -> None:
+    """Met un message en file; flush_messages() l'affiche (survit à st.rerun())."""
+    st.session_state.setdefault("pending_messages", []).append((level, message))
+
+
+def flush_messages() -> None:
+    """Affiche puis vide les messages de trade en attente."""
+    for level, message in st.session_state.pop("pending_messages", []):
+        getattr(st, level)(message)
+
+
+def _money(value: float) -> float:
+    """Arrondi au centime, pour que la balance ne dérive pas au fil des trades."""
+    return round(value, 2)
+
+
+def _apply_slippage(price: float, side: str, volatility: float = 0.01) -> float:
     """
     Slippage réaliste basé sur une distribution normale (Gaussienne).
     On suppose que le slippage moyen est nul mais que l'écart-type dépend de la volatilité.
 
     95% des trades ont un slippage < 0.05%
     """
-    # Simulation: on utilise numpy pour une distribution normale
-    slip_factor = np.random.normal(0, 0.0005)
+    # Simulation: tirage dans une distribution normale (voir _next_slip_factor)
+    slip_factor = _next_slip_factor()
 
     # Impact de marché (Market Impact) : plus on achète, plus on pousse le prix
-    slippage = price * D(str(slip_factor))
+    slippage = price * abs(slip_factor)
 
     if side == "buy":
-        return price + abs(slippage)  # On paie souvent plus cher
+        return price + slippage  # On paie souvent plus cher
     else:
-        return price - abs(slippage)  # On vend souvent moins cher
+        return price - slippage  # On vend souvent moins cher
 
 
 def execute_trade(
@@ -49,7 +86,7 @@ def execute_trade(
     option_metadata: Optional[Dict[str, Any]] = None,  # Pour stocker strike, exp, type (Call/Put)
 ) -> bool:
     """
-    Exécute un trade avec conversion Decimal et calcul du slippage.
+    Exécute un trade avec calcul du slippage et des commissions.
 
     Parameters:
     -----------
@@ -74,35 +111,30 @@ def execute_trade(
     --------
     bool : True si le trade a été exécuté, False sinon
     """
-    # Conversion en Decimal
-    d_qty = D(quantity)
-    d_raw_price = _to_decimal(raw_price)
-
-    # Récupérer la balance actuelle en Decimal
-    d_balance = _to_decimal(st.session_state.balance)
+    ss = st.session_state
+    balance = ss.balance
 
     side_map = {"Buy": "buy", "Sell": "sell", "Short": "sell", "Cover": "buy"}
     side = side_map.get(action, "buy")
 
     # Calcul du prix d'exécution avec slippage réaliste
-    fill_price = _apply_slippage(d_raw_price, side)
+    fill_price = _apply_slippage(float(raw_price), side)
 
     # Multiplicateur pour les options (100 pour contrats US)
     multiplier = 1
     if asset_type == "Option":
         multiplier = 100
 
-    gross_amount = d_qty * fill_price * D(multiplier)
-    commission_rate = _to_decimal(st.session_state.get("commission_rate", 0.001))
-    commission = gross_amount * commission_rate
+    gross_amount = quantity * fill_price * multiplier
+    commission = gross_amount * ss.get("commission_rate", 0.001)
 
     success = False
 
     # Logique Achat (Long Stock ou Long Option)
     if action == "Buy":
         total_cost = gross_amount + commission
-        if d_balance >= total_cost:
-            st.session_state.balance = float(d_balance - total_cost)
+        if balance >= total_cost:
+            ss.balance = _money(balance - total_cost)
 
             # Gestion clé unique pour les options (ex: AAPL_230915_C_150)
             if asset_type == "Option" and option_metadata:
@@ -113,15 +145,15 @@ def execute_trade(
             _add_to_portfolio(
                 pf_key,
                 quantity,
-                float(fill_price),
+                fill_price,
                 asset_type,
                 "long",
                 option_metadata,
             )
             success = True
-            st.success(f"✅ BUY {quantity} {pf_key} @ ${fill_price:.2f}")
+            _notify("success", f"✅ BUY {quantity} {pf_key} @ ${fill_price:.2f}")
         else:
-            st.error(f"Fonds insuffisants. Requis: ${total_cost:.2f}")
+            _notify("error", f"Fonds insuffisants. Requis: ${total_cost:.2f}")
 
     # Logique Vente (Close position)
     elif action == "Sell":
@@ -130,72 +162,75 @@ def execute_trade(
         else:
             pf_key = ticker
 
-        pf = st.session_state.portfolio
+        pf = ss.portfolio
         if pf_key in pf and pf[pf_key]["qty"] > 0:
             position = pf[pf_key]
             revenue = gross_amount - commission
-            pnl = revenue - (position["qty"] * D(str(position["avg_price"])) * D(multiplier))
-            st.session_state.balance = float(d_balance + revenue)
+            pnl = revenue - position["qty"] * position["avg_price"] * multiplier
+            ss.balance = _money(balance + revenue)
 
             # Supprimer la position
             del pf[pf_key]
+            _touch_portfolio()
 
             success = True
-            st.success(
-                f"✅ SELL {quantity} {pf_key} @ ${fill_price:.2f} | PnL: ${float(pnl):.2f}"
+            _notify(
+                "success",
+                f"✅ SELL {quantity} {pf_key} @ ${fill_price:.2f} | PnL: ${pnl:.2f}"
             )
         else:
-            st.error(f"Pas de position à vendre pour {pf_key}")
+            _notify("error", f"Pas de position à vendre pour {pf_key}")
 
     # Logique Short (vente à découvert)
     elif action == "Short":
         if asset_type != "Stock":
-            st.error("Shorting non disponible pour les options")
+            _notify("error", "Shorting non disponible pour les options")
         else:
             total_proceeds = gross_amount - commission
-            st.session_state.balance = float(d_balance + total_proceeds)
+            ss.balance = _money(balance + total_proceeds)
 
             if asset_type == "Stock":
                 pf_key = ticker
             else:
                 pf_key = f"{ticker}_{option_metadata['expiry']}_{option_metadata['type']}_{option_metadata['strike']}"
 
-            _add_to_portfolio(pf_key, quantity, float(fill_price), asset_type, "short", option_metadata)
+            _add_to_portfolio(pf_key, quantity, fill_price, asset_type, "short", option_metadata)
             success = True
-            st.success(f"📉 SHORT {quantity} {pf_key} @ ${fill_price:.2f}")
+            _notify("success", f"📉 SHORT {quantity} {pf_key} @ ${fill_price:.2f}")
 
     # Logique Cover (fermer une position short)
     elif action == "Cover":
         if asset_type != "Stock":
-            st.error("Covering non disponible pour les options")
+            _notify("error", "Covering non disponible pour les options")
         else:
-            pf = st.session_state.portfolio
+            pf = ss.portfolio
             if ticker in pf and pf[ticker]["side"] == "short":
                 position = pf[ticker]
                 cost = gross_amount + commission
-                pnl = (position["qty"] * D(str(position["avg_price"]))) - gross_amount
-                st.session_state.balance = float(d_balance - cost)
+                pnl = position["qty"] * position["avg_price"] - gross_amount
+                ss.balance = _money(balance - cost)
 
                 # Supprimer la position
                 del pf[ticker]
+                _touch_portfolio()
 
                 success = True
-                st.success(
-                    f"✅ COVER {quantity} {ticker} @ ${fill_price:.2f} | PnL: ${float(pnl):.2f}"
+                _notify(
+                    "success",
+                    f"✅ COVER {quantity} {ticker} @ ${fill_price:.2f} | PnL: ${pnl:.2f}"
                 )
             else:
-                st.error(f"Pas de position short à couvrir pour {ticker}")
+                _notify("error", f"Pas de position short à couvrir pour {ticker}")
 
     if success:
-        # Log using floats for display/JSON compatibility but calculations were safe
         _log_trade(
             ticker,
             action,
             quantity,
-            float(fill_price),
+            fill_price,
             raw_price,
             asset_type,
-            float(commission),
+            commission,
             note,
             tags,
         )
@@ -226,49 +261,89 @@ def _add_to_portfolio(
             "avg_price": price,
             "type": asset_type,
             "side": side,
+            # "AAPL" ou "AAPL_230915_C_150" → "AAPL", calculé une seule fois
+            "underlying": key.split("_")[0],
         }
         if metadata:
             entry.update(metadata)  # Ajoute strike, greeks initiaux, etc.
         pf[key] = entry
+    _touch_portfolio()
+
+
+def _touch_portfolio() -> None:
+    """Invalidate the cached array view after an in-place portfolio change."""
+    st.session_state._portfolio_version = st.session_state.get("_portfolio_version", 0) + 1
+
+
+def portfolio_arrays() -> Dict[str, np.ndarray]:
+    """
+    Column (struct-of-arrays) view of the portfolio for vectorized valuation.
+
+    Returns {"keys", "tickers", "qty", "avg_price", "multiplier", "short"} as
+    parallel arrays. Rebuilt only when the portfolio is mutated through the
+    engine or replaced outright (load / import / reset).
+    """
+    ss = st.session_state
+    pf = ss.portfolio
+    version = ss.get("_portfolio_version", 0)
+    cached = ss.get("_portfolio_soa")
+    if cached is not None and cached["_source"] is pf and cached["_version"] == version:
+        return cached["arrays"]
+
+    positions = list(pf.values())
+    keys = list(pf.keys())
+    arrays = {
+        "keys": np.array(keys, dtype=object),
+        # Positions d'anciennes sauvegardes n'ont pas encore "underlying"
+        "tickers": np.array(
+            [p.get("underlying") or k.split("_")[0] for k, p in zip(keys, positions)],
+            dtype=object,
+        ),
+        "qty": np.array([p["qty"] for p in positions], dtype=float),
+        "avg_price": np.array([p["avg_price"] for p in positions], dtype=float),
+        "multiplier": np.array([p.get("multiplier", 1) for p in positions], dtype=float),
+        "short": np.array([p.get("side") == "short" for p in positions], dtype=bool),
+    }
+    ss._portfolio_soa = {"_source": pf, "_version": version, "arrays": arrays}
+    return arrays
+
+
+_TRADE_LOG_COLUMNS = (
+    "timestamp", "ticker", "action", "quantity", "fill_price", "raw_price",
+    "asset_type", "commission", "note", "tags",
+)
 
 
 def _log_trade(
     ticker: str, action: str, quantity: int, fill_price: float, raw_price: float, 
     asset_type: str, commission: float, note: str, tags: Optional[List[str]]
 ) -> None:
-    """Log trade to session state for history."""
-    trade_log: Dict[str, Any] = {
-        "timestamp": datetime.now().isoformat(),
-        "ticker": ticker,
-        "action": action,
-        "quantity": quantity,
-        "fill_price": fill_price,
-        "raw_price": raw_price,
-        "asset_type": asset_type,
-        "commission": commission,
-        "note": note,
-        "tags": tags or [],
-    }
+    """Log trade to session state for history (one list per column)."""
+    ss = st.session_state
+    log = ss.get("trade_history")
+    if log is None:
+        log = ss.trade_history = {col: [] for col in _TRADE_LOG_COLUMNS}
 
-    if "trade_history" not in st.session_state:
-        st.session_state.trade_history = []
-
-    st.session_state.trade_history.append(trade_log)
+    values = (
+        datetime.now().isoformat(), ticker, action, quantity, fill_price, raw_price,
+        asset_type, commission, note, tags or [],
+    )
+    for col, value in zip(_TRADE_LOG_COLUMNS, values):
+        log[col].append(value)
 
 
 def simulate_fill_price(price: float, side: str) -> float:
     """Simule le prix de remplissage avec slippage."""
-    d_price = D(str(price))
-    fill = _apply_slippage(d_price, side)
-    return float(fill)
+    return _apply_slippage(float(price), side)
 
 
 def get_portfolio_summary() -> Dict[str, Any]:
     """Retourne un résumé du portefeuille actuel."""
-    pf = st.session_state.portfolio
+    ss = st.session_state
+    pf = ss.portfolio
     summary: Dict[str, Any] = {
         "total_positions": len(pf),
-        "cash": st.session_state.balance,
+        "cash": ss.balance,
         "positions": {},
     }
 
@@ -296,24 +371,19 @@ def get_portfolio_value(current_prices: Optional[Dict[str, float]] = None) -> fl
     --------
     float : Valeur totale du portefeuille
     """
-    pf = st.session_state.portfolio
     total = st.session_state.balance
-    
+
     if current_prices:
-        for key, pos in pf.items():
-            # Extraire le ticker du portefeuille (key peut être "AAPL" ou "AAPL_230915_C_150")
-            ticker = key.split("_")[0]
-            if ticker in current_prices:
-                price = current_prices[ticker]
-                multiplier = pos.get("multiplier", 1)
-                value = pos["qty"] * price * multiplier
-                
-                # Pour les shorts, la valeur change inversement
-                if pos.get("side") == "short":
-                    value = -value
-                    
-                total += value
-    
+        soa = portfolio_arrays()
+        # Ticker sans prix (absent ou None) → position ignorée
+        prices = np.array(
+            [current_prices.get(t) for t in soa["tickers"]], dtype=float
+        )
+        values = soa["qty"] * prices * soa["multiplier"]
+        # Pour les shorts, la valeur change inversement
+        values = np.where(soa["short"], -values, values)
+        total += float(np.nansum(values))
+
     return total
 
 
@@ -325,17 +395,15 @@ def get_margin_usage() -> Dict[str, Any]:
     --------
     dict : {"positions": int, "margin_used": float, "margin_pct": float, "margin_available": float}
     """
-    pf = st.session_state.portfolio
-    margin_used = 0.0
-    short_positions = 0
-    
+    soa = portfolio_arrays()
+    short = soa["short"]
+    short_positions = int(short.sum())
+
     # Margin requirement: 50% de la valeur pour shorting
-    for _, pos in pf.items():
-        if pos.get("side") == "short":
-            short_positions += 1
-            multiplier = pos.get("multiplier", 1)
-            margin_used += pos["qty"] * pos["avg_price"] * multiplier * 0.5
-    
+    margin_used = float(
+        (soa["qty"] * soa["avg_price"] * soa["multiplier"])[short].sum() * 0.5
+    )
+
     initial_margin = 100_000.0  # Capital initial approximatif
     margin_available = initial_margin - margin_used
     margin_pct = (margin_used / initial_margin * 100) if initial_margin > 0 else 0.0
@@ -2,7 +2,9 @@
 Trading page — chart, order entry, and market analysis.
 """
 
+import re
 import streamlit as st
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
@@ -11,16 +13,17 @@ from lib.styles import MAIN_CSS
 from lib.config import PERIOD_MAP, INTERVAL_MAP, VALID_COMBOS
 from lib.data_fetcher import (
     fetch_history, fetch_info, get_current_price,
-    fetch_options_expirations, fetch_options_chain, fetch_news,
+    fetch_options_expirations, fetch_options_chain, fetch_news_async, run_async,
 )
-from lib.trading_engine import execute_trade, simulate_fill_price
+from lib.trading_engine import execute_trade, flush_messages, simulate_fill_price
 from lib.orders import (
     place_order, place_oco_bracket, place_trailing_stop,
-    check_pending_orders, cancel_order, get_active_orders,
+    check_pending_orders, cancel_orders, get_active_orders,
 )
 from lib.scanner import add_alert
 from lib.indicators import pivot_points, fibonacci_retracement, find_support_resistance
-from lib.charts import build_main_chart
+from lib.charts import WEBGL_MIN_BARS, build_main_chart, multi_timeframe_chart
+from lib.options_pricing import bs_price_greeks
 
 st.set_page_config(page_title="Trading", page_icon="⚡", layout="wide")
 st.markdown(MAIN_CSS, unsafe_allow_html=True)
@@ -49,8 +52,23 @@ if period_label not in valid_periods:
     period = "3mo"
 
 asset_class = st.sidebar.selectbox("Instrument", ["Stock / Forex / Crypto", "Options Chain"])
+fast_mode = st.sidebar.checkbox(
+    "Fast mode", value=False,
+    help="Price and volume from the price history; skips the company info lookup "
+         "(no market cap / beta)",
+)
+# None leaves the choice to build_main_chart, which switches above WEBGL_MIN_BARS bars
+_RENDER_MODES = {"Auto": None, "On": True, "Off": False}
+fast_render = _RENDER_MODES[st.sidebar.selectbox(
+    "⚡ Fast render (WebGL)", list(_RENDER_MODES), key="fast_render",
+    help="WebGL lines and merged candles; much smoother on long histories. "
+         f"Auto turns it on above {WEBGL_MIN_BARS:,} bars",
+)]
 
 # ── Indicators config ─────────────────────────────────────────
+# Comma-separated whole numbers; any other token is ignored
+_PERIOD_RE = re.compile(r"(?:^|,)\s*(\d+)\s*(?=,|$)")
+
 st.sidebar.header("📐 Indicators")
 
 # Overlays
@@ -58,13 +76,13 @@ show_sma = st.sidebar.checkbox("SMA", value=True)
 sma_periods = []
 if show_sma:
     sma_input = st.sidebar.text_input("SMA Periods (comma-sep)", "20, 50")
-    sma_periods = [int(x.strip()) for x in sma_input.split(",") if x.strip().isdigit()]
+    sma_periods = [int(x) for x in _PERIOD_RE.findall(sma_input)]
 
 show_ema = st.sidebar.checkbox("EMA")
 ema_periods = []
 if show_ema:
     ema_input = st.sidebar.text_input("EMA Periods", "12, 26")
-    ema_periods = [int(x.strip()) for x in ema_input.split(",") if x.strip().isdigit()]
+    ema_periods = [int(x) for x in _PERIOD_RE.findall(ema_input)]
 
 show_bb = st.sidebar.checkbox("Bollinger Bands")
 show_vwap = st.sidebar.checkbox("VWAP")
@@ -91,26 +109,41 @@ show_pivot = st.sidebar.checkbox("Pivot Points")
 # ══════════════════════════════════════════════════════════════
 
 try:
-    hist = fetch_history(ticker_input, period, interval)
-    info = fetch_info(ticker_input)
+    # All network fetches start together; each result is read where it is needed
+    # (news only at the bottom of the page)
+    news_future = fetch_news_async(ticker_input)
+    hist_future = run_async(fetch_history, ticker_input, period, interval)
+    info_future = None if fast_mode else run_async(fetch_info, ticker_input)
+    expirations_future = (
+        run_async(fetch_options_expirations, ticker_input)
+        if asset_class == "Options Chain" else None
+    )
+    hist = hist_future.result()
+    closes = hist["Close"].to_numpy()
+    info = info_future.result() if info_future else {}
     current_price = float(
         info.get("currentPrice")
         or info.get("regularMarketPrice")
-        or hist["Close"].iloc[-1]
+        or closes[-1]
     )
 
     # Check pending orders
-    check_pending_orders(current_price, ticker_input)
+    if st.session_state.pending_orders:
+        check_pending_orders(current_price, ticker_input)
+    # Trade messages from this run's order fills and the run before st.rerun()
+    flush_messages()
 
     # ── Header metrics ────────────────────────────────────
     st.title(f"⚡ {ticker_input}")
     c1, c2, c3, c4, c5 = st.columns(5)
     with c1:
-        day_chg = hist["Close"].iloc[-1] - hist["Close"].iloc[-2] if len(hist) > 1 else 0
-        day_pct = (day_chg / hist["Close"].iloc[-2] * 100) if len(hist) > 1 else 0
+        day_chg = closes[-1] - closes[-2] if len(closes) > 1 else 0
+        day_pct = (day_chg / closes[-2] * 100) if len(closes) > 1 else 0
         st.metric("Price", f"${current_price:,.2f}", delta=f"{day_chg:+.2f} ({day_pct:+.2f}%)")
     with c2:
-        vol = info.get("volume") or info.get("regularMarketVolume") or 0
+        vol = info.get("volume") or info.get("regularMarketVolume") or (
+            hist["Volume"].to_numpy()[-1] if fast_mode else 0
+        )
         st.metric("Volume", f"{vol:,.0f}")
     with c3:
         mkt_cap = info.get("marketCap")
@@ -139,22 +172,29 @@ try:
         "stoch_rsi": show_stoch_rsi, "adx": show_adx, "obv": show_obv, "mfi": show_mfi,
     }
     fig = build_main_chart(hist, overlays, panels,
-                           support_resistance=show_sr, fib_levels=show_fib, pivot=show_pivot)
+                           support_resistance=show_sr, fib_levels=show_fib, pivot=show_pivot,
+                           fast_render=fast_render)
     st.plotly_chart(fig, use_container_width=True)
 
     # ── Multi-timeframe ───────────────────────────────────
     with st.expander("🔍 Multi-Timeframe View"):
-        mtf_cols = st.columns(3)
-        timeframes = {"Daily": ("6mo", "1d"), "4H": ("1mo", "1h"), "1H": ("5d", "1h")}
-        from lib.charts import multi_timeframe_chart
-        mtf_data = {}
-        for label, (p, i) in timeframes.items():
-            try:
-                mtf_data[label] = fetch_history(ticker_input, p, i)
-            except Exception:
-                pass
-        if mtf_data:
-            st.plotly_chart(multi_timeframe_chart(mtf_data), use_container_width=True)
+        # The expander body runs even when collapsed: the downloads and the
+        # figure are only done once the view is switched on
+        if st.checkbox("Show Multi-Timeframe", key="mtf_on"):
+            timeframes = {"Daily": ("6mo", "1d"), "4H": ("1mo", "1h"), "1H": ("5d", "1h")}
+            # The three downloads overlap instead of running back to back
+            mtf_futures = {
+                label: run_async(fetch_history, ticker_input, p, i)
+                for label, (p, i) in timeframes.items()
+            }
+            mtf_data = {}
+            for label, future in mtf_futures.items():
+                try:
+                    mtf_data[label] = future.result()
+                except Exception:
+                    pass
+            if mtf_data:
+                st.plotly_chart(multi_timeframe_chart(mtf_data), use_container_width=True)
 
     # ── Trading Zone ──────────────────────────────────────
     st.markdown("---")
@@ -168,6 +208,8 @@ try:
                 "Market", "Limit / Stop", "Trailing Stop", "OCO Bracket", "Short Selling"
             ])
 
+            # Inputs behind a preview stay outside the forms, so the preview
+            # always shows the order the submit button sends
             with tab_market:
                 mc1, mc2, mc3 = st.columns([1, 1, 1])
                 with mc1:
@@ -180,70 +222,70 @@ try:
                     st.markdown(f"**Est. Total:** ${total:,.2f}")
                     st.caption(f"Est. fill: ${est_fill:.2f}")
 
-                note = st.text_input("Trade note (optional)", key="mkt_note")
-                tags = st.multiselect("Tags", ["Momentum", "Mean Reversion", "Breakout",
-                    "Scalp", "Swing", "News", "Technical", "Fundamental"], key="mkt_tags")
+                with st.form("market_form", border=False):
+                    note = st.text_input("Trade note (optional)", key="mkt_note")
+                    tags = st.multiselect("Tags", ["Momentum", "Mean Reversion", "Breakout",
+                        "Scalp", "Swing", "News", "Technical", "Fundamental"], key="mkt_tags")
 
-                if st.button("🚀 Execute Market Order", use_container_width=True, type="primary"):
-                    execute_trade(ticker_input, action, qty, current_price, note=note, tags=tags)
-                    st.rerun()
+                    if st.form_submit_button("🚀 Execute Market Order", use_container_width=True, type="primary"):
+                        execute_trade(ticker_input, action, qty, current_price, note=note, tags=tags)
+                        st.rerun()
 
             with tab_limit:
-                lc1, lc2, lc3, lc4 = st.columns(4)
-                with lc1:
-                    order_type = st.selectbox("Type", ["Limit Buy", "Limit Sell", "Stop-Loss", "Take-Profit"])
-                with lc2:
-                    target = st.number_input("Target $", min_value=0.01,
-                        value=round(current_price, 2), step=0.01, key="lim_target")
-                with lc3:
-                    lim_qty = st.number_input("Qty", min_value=1, value=10, key="lim_qty")
-                with lc4:
-                    st.markdown("<br>", unsafe_allow_html=True)
-                    if st.button("📋 Place Order", use_container_width=True, key="place_lim"):
-                        o = place_order(ticker_input, order_type, target, lim_qty)
-                        st.success(f"Order placed: {o['id']}")
+                with st.form("limit_form", border=False):
+                    lc1, lc2, lc3, lc4 = st.columns(4)
+                    with lc1:
+                        order_type = st.selectbox("Type", ["Limit Buy", "Limit Sell", "Stop-Loss", "Take-Profit"])
+                    with lc2:
+                        target = st.number_input("Target $", min_value=0.01,
+                            value=round(current_price, 2), step=0.01, key="lim_target")
+                    with lc3:
+                        lim_qty = st.number_input("Qty", min_value=1, value=10, key="lim_qty")
+                    with lc4:
+                        st.markdown("<br>", unsafe_allow_html=True)
+                        if st.form_submit_button("📋 Place Order", use_container_width=True, key="place_lim"):
+                            o = place_order(ticker_input, order_type, target, lim_qty)
+                            st.success(f"Order placed: {o['id']}")
 
             with tab_trailing:
-                tc1, tc2, tc3 = st.columns(3)
-                with tc1:
-                    trail_type = st.radio("Trail by", ["Percentage", "Fixed $"], horizontal=True)
-                with tc2:
-                    if trail_type == "Percentage":
-                        trail_val = st.number_input("Trail %", min_value=0.1, value=5.0, step=0.5)
-                    else:
-                        trail_val = st.number_input("Trail $", min_value=0.01, value=5.0, step=0.5)
-                with tc3:
-                    trail_qty = st.number_input("Qty", min_value=1, value=10, key="trail_qty")
-
+                trail_type = st.radio("Trail by", ["Percentage", "Fixed $"], horizontal=True)
+                if trail_type == "Percentage":
+                    trail_val = st.number_input("Trail %", min_value=0.1, value=5.0, step=0.5)
+                else:
+                    trail_val = st.number_input("Trail $", min_value=0.01, value=5.0, step=0.5)
                 st.caption(f"Current stop level: ${current_price * (1 - trail_val/100):,.2f}" if trail_type == "Percentage"
                           else f"Current stop level: ${current_price - trail_val:,.2f}")
-                if st.button("📉 Place Trailing Stop", use_container_width=True):
-                    place_trailing_stop(
-                        ticker_input, trail_qty, current_price,
-                        trail_pct=trail_val if trail_type == "Percentage" else None,
-                        trail_amount=trail_val if trail_type == "Fixed $" else None,
-                    )
-                    st.success("Trailing stop placed!")
+
+                with st.form("trailing_form", border=False):
+                    trail_qty = st.number_input("Qty", min_value=1, value=10, key="trail_qty")
+                    if st.form_submit_button("📉 Place Trailing Stop", use_container_width=True):
+                        place_trailing_stop(
+                            ticker_input, trail_qty, current_price,
+                            trail_pct=trail_val if trail_type == "Percentage" else None,
+                            trail_amount=trail_val if trail_type == "Fixed $" else None,
+                        )
+                        st.success("Trailing stop placed!")
 
             with tab_oco:
                 st.caption("One-Cancels-Other: Stop-Loss + Take-Profit linked together")
-                oc1, oc2, oc3 = st.columns(3)
+                oc1, oc2 = st.columns(2)
                 with oc1:
                     sl_price = st.number_input("Stop-Loss $", value=round(current_price * 0.95, 2),
                         step=0.01, key="oco_sl")
                 with oc2:
                     tp_price = st.number_input("Take-Profit $", value=round(current_price * 1.10, 2),
                         step=0.01, key="oco_tp")
-                with oc3:
-                    oco_qty = st.number_input("Qty", min_value=1, value=10, key="oco_qty")
-
                 rr = abs(tp_price - current_price) / abs(current_price - sl_price) if current_price != sl_price else 0
                 st.caption(f"Risk/Reward: 1:{rr:.2f}")
-                if st.button("🔗 Place OCO Bracket", use_container_width=True):
-                    place_oco_bracket(ticker_input, oco_qty, sl_price, tp_price)
-                    st.success("OCO bracket placed!")
+
+                with st.form("oco_form", border=False):
+                    oco_qty = st.number_input("Qty", min_value=1, value=10, key="oco_qty")
+                    if st.form_submit_button("🔗 Place OCO Bracket", use_container_width=True):
+                        place_oco_bracket(ticker_input, oco_qty, sl_price, tp_price)
+                        st.success("OCO bracket placed!")
 
             with tab_short:
+                # Every input here drives the margin / cost preview: no form
                 sc1, sc2, sc3 = st.columns(3)
                 with sc1:
                     short_action = st.selectbox("Action", ["Short", "Cover"], key="short_act")
@@ -262,23 +304,51 @@ try:
         elif asset_class == "Options Chain":
             st.info("📋 Options Chain — analyze and trade with Black-Scholes pricing")
             try:
-                expirations = fetch_options_expirations(ticker_input)
+                expirations = expirations_future.result()
                 if expirations:
                     expiry = st.selectbox("Expiration", expirations)
                     calls_df, puts_df = fetch_options_chain(ticker_input, expiry)
                     opt_type = st.radio("Type", ["Calls", "Puts"], horizontal=True)
                     df_opt = calls_df if opt_type == "Calls" else puts_df
                     
-                    # Filtrer autour du prix actuel
-                    df_filtered = df_opt[
-                        (df_opt["strike"] > current_price * 0.85) &
-                        (df_opt["strike"] < current_price * 1.15)
-                    ]
+                    # Filtrer autour du prix actuel (chaîne triée par strike : deux
+                    # recherches dichotomiques au lieu de deux masques)
+                    if not df_opt["strike"].is_monotonic_increasing:
+                        df_opt = df_opt.sort_values("strike", kind="stable")
+                    strikes = df_opt["strike"].to_numpy()
+                    lo = np.searchsorted(strikes, current_price * 0.85, side="right")
+                    hi = np.searchsorted(strikes, current_price * 1.15, side="left")
+                    df_filtered = df_opt.iloc[lo:hi]
+                    # Une ligne par strike pour la sélection ci-dessous
+                    rows_by_strike = df_filtered.drop_duplicates("strike").set_index(
+                        "strike", drop=False
+                    )
+
+                    # Black-Scholes sur toute la fenêtre en un seul passage vectorisé
+                    T = (datetime.strptime(expiry, "%Y-%m-%d") - datetime.now()).days / 365.0
+                    is_call = opt_type == "Calls"
+                    theo = None
+                    if T > 0:
+                        theo = bs_price_greeks(
+                            S=current_price,
+                            K=rows_by_strike["strike"].to_numpy(),
+                            T=T,
+                            r=0.045,  # Taux sans risque approximé
+                            sigma=rows_by_strike["impliedVolatility"].to_numpy()
+                            if "impliedVolatility" in rows_by_strike else 0.2,
+                            is_call=is_call,
+                        )
                     
                     display_cols = ["contractSymbol", "strike", "lastPrice", "bid", "ask",
                                     "volume", "openInterest", "impliedVolatility"]
                     available = [c for c in display_cols if c in df_filtered.columns]
-                    st.dataframe(df_filtered[available], use_container_width=True)
+                    df_display = df_filtered[available]
+                    if theo is not None:
+                        theo_by_strike = pd.Series(theo["Price"], index=rows_by_strike.index)
+                        df_display = df_display.assign(
+                            theoBS=df_filtered["strike"].map(theo_by_strike).round(2)
+                        )
+                    st.dataframe(df_display, use_container_width=True)
                     
                     # ── Options Analysis & Trading ───────────────────────────
                     st.markdown("---")
@@ -290,34 +360,27 @@ try:
                         st.write("#### 📊 Analyse Black-Scholes")
                         selected_strike = st.selectbox(
                             "Sélectionner Strike", 
-                            sorted(df_filtered['strike'].unique()),
+                            rows_by_strike.index,
                             key="opt_strike"
                         )
                         
                         # Récupérer les données de l'option
-                        opt_data = df_filtered[df_filtered['strike'] == selected_strike].iloc[0]
-                        
-                        # Calcul du temps jusqu'à l'expiration
-                        from datetime import datetime as dt
-                        T = (dt.strptime(expiry, "%Y-%m-%d") - dt.now()).days / 365.0
+                        opt_data = rows_by_strike.loc[selected_strike]
                         
-                        if T > 0:
-                            # Import et calcul Black-Scholes
-                            from lib.options_pricing import OptionCalculator
-                            
-                            bs = OptionCalculator(
-                                S=current_price,
-                                K=selected_strike,
-                                T=T,
-                                r=0.045,  # Taux sans risque approximé
-                                sigma=opt_data.get('impliedVolatility', 0.2),
-                                option_type=opt_type.lower()[:-1]  # "call" ou "put"
+                        if theo is not None:
+                            i = rows_by_strike.index.get_loc(selected_strike)
+                            theo_price = theo["Price"][i]
+                            greeks = {
+                                "Delta": round(theo["Delta"][i], 3),
+                                "Gamma": round(theo["Gamma"][i], 4),
+                                "Theta": round(theo["Theta"][i], 3),
+                                "Vega": round(theo["Vega"][i], 3),
+                            }
+                            intrinsic = max(
+                                (current_price - selected_strike) if is_call
+                                else (selected_strike - current_price), 0.0
                             )
-                            
-                            theo_price = bs.price()
-                            greeks = bs.greeks()
-                            intrinsic = bs.intrinsic_value()
-                            time_value = bs.time_value()
+                            time_value = max(theo_price - intrinsic, 0.0)
                             
                             # Affichage
                             st.metric(
@@ -382,6 +445,7 @@ try:
                             
                             if success:
                                 st.rerun()
+                            flush_messages()
                 else:
                     st.warning("No options available for this ticker.")
             except Exception as e:
@@ -392,26 +456,28 @@ try:
         if active:
             st.markdown("---")
             st.subheader("📋 Pending Orders")
-            for i, o in enumerate(st.session_state.pending_orders):
-                oc1, oc2 = st.columns([5, 1])
-                with oc1:
-                    oco_tag = f" (OCO: {o['oco_pair_id']})" if o.get("oco_pair_id") else ""
-                    trail_tag = ""
-                    if o["type"] == "Trailing-Stop":
-                        trail_tag = f" | High: ${o.get('highest_price', 0):.2f}"
-                    st.caption(
-                        f"**{o['id']}** — {o['type']} | {o['qty']} × {o['ticker']} "
-                        f"@ ${o['target_price']:.2f}{oco_tag}{trail_tag} | {o['created']}"
-                    )
-                with oc2:
-                    if st.button("❌", key=f"cancel_{i}"):
-                        cancel_order(i)
-                        st.rerun()
+            orders = st.session_state.pending_orders
+            # One table instead of a caption and a button per order
+            st.dataframe(
+                pd.DataFrame.from_records(orders, columns=[
+                    "id", "type", "qty", "ticker", "target_price",
+                    "highest_price", "oco_pair_id", "created",
+                ]),
+                use_container_width=True, hide_index=True,
+            )
+            # Selected by id: a fill on the next rerun shifts list positions
+            labels = {o["id"]: f"{o['id']} — {o['type']} {o['ticker']}" for o in orders}
+            to_cancel = st.multiselect(
+                "Cancel orders", list(labels), format_func=labels.get, key="cancel_sel",
+            )
+            if to_cancel and st.button("❌ Cancel selected", key="cancel_orders"):
+                cancel_orders(to_cancel)
+                st.rerun()
 
     with info_col:
         # News
         st.subheader("📰 News")
-        news = fetch_news(ticker_input)
+        news = news_future.result()
         if news:
             for n in news[:7]:
                 title = n.get("title", "Untitled")
@@ -427,16 +493,17 @@ try:
         # Price alerts
         st.markdown("---")
         st.subheader("🔔 Alerts")
-        al1, al2 = st.columns(2)
-        with al1:
-            alert_cond = st.selectbox("Condition", ["above", "below"], key="alert_cond")
-        with al2:
-            alert_price = st.number_input("Price $", value=round(current_price, 2),
-                step=0.01, key="alert_price")
-        alert_note = st.text_input("Note", key="alert_note")
-        if st.button("🔔 Set Alert", use_container_width=True):
-            add_alert(ticker_input, alert_cond, alert_price, alert_note)
-            st.success("Alert set!")
+        with st.form("alert_form", border=False):
+            al1, al2 = st.columns(2)
+            with al1:
+                alert_cond = st.selectbox("Condition", ["above", "below"], key="alert_cond")
+            with al2:
+                alert_price = st.number_input("Price $", value=round(current_price, 2),
+                    step=0.01, key="alert_price")
+            alert_note = st.text_input("Note", key="alert_note")
+            if st.form_submit_button("🔔 Set Alert", use_container_width=True):
+                add_alert(ticker_input, alert_cond, alert_price, alert_note)
+                st.success("Alert set!")
 
         if st.session_state.alerts:
             for i, a in enumerate(st.session_state.alerts):
@@ -445,28 +512,30 @@ try:
     # ── Risk Calculator ───────────────────────────────────
     st.markdown("---")
     with st.expander("🎯 Position Sizing & Risk Calculator"):
-        rc1, rc2, rc3, rc4 = st.columns(4)
-        with rc1:
-            entry_price = st.number_input("Entry $", value=round(current_price, 2), step=0.01, key="rc_entry")
-        with rc2:
-            sl = st.number_input("Stop-Loss $", value=round(current_price * 0.95, 2), step=0.01, key="rc_sl")
-        with rc3:
-            tp = st.number_input("Take-Profit $", value=round(current_price * 1.10, 2), step=0.01, key="rc_tp")
-        with rc4:
-            risk_pct = st.number_input("Risk % of capital", value=2.0, step=0.5, key="rc_risk")
-
-        if entry_price > 0 and sl > 0 and sl != entry_price:
-            risk_per_share = abs(entry_price - sl)
-            reward_per_share = abs(tp - entry_price)
-            risk_amount = st.session_state.balance * (risk_pct / 100)
-            optimal_qty = int(risk_amount / risk_per_share)
-            rr = reward_per_share / risk_per_share if risk_per_share > 0 else 0
-
-            r1, r2, r3, r4 = st.columns(4)
-            r1.metric("Optimal Size", f"{optimal_qty} shares")
-            r2.metric("Risk / Share", f"${risk_per_share:.2f}")
-            r3.metric("Total Risk", f"${risk_per_share * optimal_qty:.2f}")
-            r4.metric("R:R Ratio", f"1:{rr:.2f}")
+        with st.form("risk_calc_form", border=False):
+            rc1, rc2, rc3, rc4 = st.columns(4)
+            with rc1:
+                entry_price = st.number_input("Entry $", value=round(current_price, 2), step=0.01, key="rc_entry")
+            with rc2:
+                sl = st.number_input("Stop-Loss $", value=round(current_price * 0.95, 2), step=0.01, key="rc_sl")
+            with rc3:
+                tp = st.number_input("Take-Profit $", value=round(current_price * 1.10, 2), step=0.01, key="rc_tp")
+            with rc4:
+                risk_pct = st.number_input("Risk % of capital", value=2.0, step=0.5, key="rc_risk")
+            st.form_submit_button("Calculate", use_container_width=True)
+
+            if entry_price > 0 and sl > 0 and sl != entry_price:
+                risk_per_share = abs(entry_price - sl)
+                reward_per_share = abs(tp - entry_price)
+                risk_amount = st.session_state.balance * (risk_pct / 100)
+                optimal_qty = int(risk_amount / risk_per_share)
+                rr = reward_per_share / risk_per_share if risk_per_share > 0 else 0
+
+                r1, r2, r3, r4 = st.columns(4)
+                r1.metric("Optimal Size", f"{optimal_qty} shares")
+                r2.metric("Risk / Share", f"${risk_per_share:.2f}")
+                r3.metric("Total Risk", f"${risk_per_share * optimal_qty:.2f}")
+                r4.metric("R:R Ratio", f"1:{rr:.2f}")
 
 except Exception as e:
     st.error(f"Error loading **{ticker_input}**: {e}")
@@ -5,18 +5,17 @@ Analysis page — deep performance analytics, risk metrics, correlation, sectors
 import streamlit as st
 import pandas as pd
 import numpy as np
-import io
 from datetime import datetime
 
 from lib.state import init_session_state
 from lib.styles import MAIN_CSS
 from lib.performance import (
     compute_performance_stats, current_drawdown, compute_var,
-    get_trade_distribution, compute_portfolio_beta,
+    get_trade_distribution, compute_portfolio_beta, closed_pnl_array,
 )
-from lib.trading_engine import get_portfolio_value
+from lib.trading_engine import get_margin_usage, portfolio_arrays
 from lib.data_fetcher import (
-    get_batch_prices, fetch_benchmark, fetch_correlation_data, get_sector_info,
+    fetch_benchmark, fetch_correlation_data, get_sector_info,
 )
 from lib.charts import (
     equity_curve_chart, pnl_distribution_chart, allocation_pie,
@@ -39,8 +38,13 @@ tab_perf, tab_risk, tab_journal, tab_alloc, tab_corr = st.tabs([
 
 stats = compute_performance_stats()
 
+# Tabs with their own widgets are fragments: toggling the benchmark, filtering
+# the journal or editing the correlation list reruns that tab only
+
+
 # ── Performance ───────────────────────────────────────────────
-with tab_perf:
+@st.fragment
+def _performance_tab(stats: dict):
     if stats["total_trades"] > 0:
         # Row 1: Core metrics
         p1, p2, p3, p4, p5, p6 = st.columns(6)
@@ -98,9 +102,8 @@ with tab_perf:
             st.plotly_chart(fig_eq, use_container_width=True)
 
         # P&L distribution
-        closed_pnls = [t["pnl"] for t in st.session_state.history
-                       if isinstance(t.get("pnl"), (int, float))]
-        if closed_pnls:
+        closed_pnls = closed_pnl_array()
+        if len(closed_pnls):
             st.plotly_chart(pnl_distribution_chart(closed_pnls), use_container_width=True)
 
         # Distribution stats
@@ -115,6 +118,10 @@ with tab_perf:
     else:
         st.info("No trades yet. Start trading to see analytics!")
 
+
+with tab_perf:
+    _performance_tab(stats)
+
 # ── Risk ──────────────────────────────────────────────────────
 with tab_risk:
     st.subheader("⚠️ Risk Metrics")
@@ -137,7 +144,6 @@ with tab_risk:
     v8.metric("Kelly Optimal %", f"{stats['kelly_pct']:.1f}%")
 
     # Margin info
-    from lib.trading_engine import get_margin_usage
     margin = get_margin_usage()
     if margin["positions"] > 0:
         st.markdown("---")
@@ -148,11 +154,13 @@ with tab_risk:
         m3.metric("Margin %", f"{margin['margin_pct']:.1f}%")
 
 # ── Journal ───────────────────────────────────────────────────
-with tab_journal:
+@st.fragment
+def _journal_tab():
     st.subheader("📜 Trade Journal")
 
     if st.session_state.history:
-        df_hist = pd.DataFrame(st.session_state.history)[::-1].reset_index(drop=True)
+        # Newest first; the index is hidden and not exported, so it is not reset
+        df_hist = pd.DataFrame(st.session_state.history).iloc[::-1]
 
         # Filters
         f1, f2, f3 = st.columns(3)
@@ -170,10 +178,10 @@ with tab_journal:
             df_hist = df_hist[df_hist["ticker"].str.contains(filter_ticker.upper())]
         if filter_action:
             df_hist = df_hist[df_hist["action"].isin(filter_action)]
-        if filter_result == "Winners only":
-            df_hist = df_hist[df_hist["pnl"].apply(lambda x: isinstance(x, (int, float)) and x > 0)]
-        elif filter_result == "Losers only":
-            df_hist = df_hist[df_hist["pnl"].apply(lambda x: isinstance(x, (int, float)) and x < 0)]
+        if filter_result != "All":
+            # Opening trades have no P&L: NaN fails both comparisons
+            pnl_num = pd.to_numeric(df_hist["pnl"], errors="coerce")
+            df_hist = df_hist[pnl_num > 0 if filter_result == "Winners only" else pnl_num < 0]
 
         st.dataframe(df_hist, use_container_width=True, hide_index=True)
 
@@ -195,16 +203,19 @@ with tab_journal:
 
         # Export
         st.markdown("---")
-        csv_buf = io.StringIO()
-        df_hist.to_csv(csv_buf, index=False)
+        # The CSV is generated on click, not on every rerun
         st.download_button(
-            "📥 Export Journal (CSV)", csv_buf.getvalue(),
+            "📥 Export Journal (CSV)", lambda: df_hist.to_csv(index=False),
             file_name=f"trading_journal_{datetime.now().strftime('%Y%m%d')}.csv",
             mime="text/csv",
         )
     else:
         st.info("No trades yet.")
 
+
+with tab_journal:
+    _journal_tab()
+
 # ── Allocation ────────────────────────────────────────────────
 with tab_alloc:
     st.subheader("🥧 Portfolio Allocation")
@@ -217,18 +228,18 @@ with tab_alloc:
         # Sector exposure
         st.markdown("---")
         st.subheader("🏗️ Sector Exposure")
-        portfolio_tickers = tuple(
-            k.replace("_SHORT", "") for k in st.session_state.portfolio.keys()
-        )
+        soa = portfolio_arrays()
+        portfolio_tickers = tuple(k.replace("_SHORT", "") for k in soa["keys"])
         if portfolio_tickers:
             try:
                 sectors = get_sector_info(portfolio_tickers)
-                sector_values: dict[str, float] = {}
-                for key, pos in st.session_state.portfolio.items():
-                    clean = key.replace("_SHORT", "")
-                    sect = sectors.get(clean, "Other")
-                    val = pos["qty"] * pos["avg_price"]
-                    sector_values[sect] = sector_values.get(sect, 0) + val
+                # Cost basis summed per sector, in first-seen order
+                sector_values = (
+                    pd.Series(soa["qty"] * soa["avg_price"])
+                    .groupby([sectors.get(t, "Other") for t in portfolio_tickers], sort=False)
+                    .sum()
+                    .to_dict()
+                )
 
                 fig_sect = sector_pie(sector_values)
                 st.plotly_chart(fig_sect, use_container_width=True)
@@ -238,15 +249,19 @@ with tab_alloc:
         st.info("Portfolio is empty — all cash.")
 
 # ── Correlation ───────────────────────────────────────────────
-with tab_corr:
+@st.fragment
+def _correlation_tab():
     st.subheader("🔗 Correlation Matrix")
 
     default_tickers = list(st.session_state.watchlist)[:8]
-    corr_input = st.text_input(
-        "Tickers (comma-separated)",
-        value=", ".join(default_tickers),
-        key="corr_tickers",
-    )
+    # Edits apply on submit only; in between, the cached matrix is redrawn
+    with st.form("corr_form", border=False):
+        corr_input = st.text_input(
+            "Tickers (comma-separated)",
+            value=", ".join(default_tickers),
+            key="corr_tickers",
+        )
+        st.form_submit_button("Compute")
     corr_tickers = tuple(t.strip().upper() for t in corr_input.split(",") if t.strip())
 
     if len(corr_tickers) >= 2:
@@ -258,3 +273,7 @@ with tab_corr:
             st.error(f"Correlation error: {e}")
     else:
         st.info("Enter at least 2 tickers to compute correlation.")
+
+
+with tab_corr:
+    _correlation_tab()
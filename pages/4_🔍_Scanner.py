@@ -24,7 +24,7 @@ universe_choice = st.radio(
 )
 
 if universe_choice == "S&P 500 Sample (~36)":
-    tickers = tuple(SCANNER_SP500_SAMPLE)
+    tickers = SCANNER_SP500_SAMPLE
 elif universe_choice == "Watchlist":
     tickers = tuple(st.session_state.watchlist)
 else:
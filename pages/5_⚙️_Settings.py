@@ -135,9 +135,10 @@ st.subheader("📤 Export / Import")
 
 exp1, exp2 = st.columns(2)
 with exp1:
+    # Serialized on click rather than on every rerun of the page
     st.download_button(
         "📥 Export State (JSON)",
-        export_state_string(),
+        export_state_string,
         file_name="trading_lab_state.json",
         mime="application/json",
     )